@@ -0,0 +1,20 @@
+import { useEffect, useState } from "react";
+import { loadAllJukugo } from "@/features/kanji-core/logic/jukugoShards";
+import { JukugoDefinition } from "@/features/kanji-core/types";
+
+// 図鑑用: 問題DBの全シャードを読み込む（読み込みが終わるまでは null）
+export function useAllJukugo(): JukugoDefinition[] | null {
+  const [data, setData] = useState<JukugoDefinition[] | null>(null);
+
+  useEffect(() => {
+    let active = true;
+    loadAllJukugo().then((list) => {
+      if (active) setData(list);
+    });
+    return () => {
+      active = false;
+    };
+  }, []);
+
+  return data;
+}
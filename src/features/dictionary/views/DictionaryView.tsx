@@ -1,19 +1,19 @@
 "use client";
 
 import Link from "next/link";
-import { useState, useMemo, useEffect } from "react";
+import { useState, useEffect } from "react";
 // ★修正1: useGameStore ではなく、図鑑専用の useDictionaryStore を使う
 import { useDictionaryStore } from "@/features/dictionary/stores/dictionarySlice";
 // ★修正2: 熟語データだけでなく、合体レシピデータも使う
-import idsMapData from "@/features/kanji-core/data/ids-map-auto.json";
-import jukugoDataRaw from "@/features/kanji-core/data/jukugo-db-auto.json";
-import { JukugoDefinition } from "@/features/kanji-core/types";
+// ★修正5: 図鑑の文字一覧は事前生成の転置インデックスを使う
+import invertedIndexData from "@/features/kanji-core/data/inverted-index-auto.json";
+// 熟語の総数はシャードのマニフェストから取る（本体は一覧タブで読み込む）
+import { getShardManifest } from "@/features/kanji-core/logic/jukugoShards";
+import { InvertedIndex } from "@/features/kanji-core/types";
 import { JukugoListView } from "./JukugoListView";
 import { KanjiListView } from "./KanjiListView";
 
-const jukugoData = jukugoDataRaw as JukugoDefinition[];
-// JSONを適切な型として扱う
-const idsMap = idsMapData as Record<string, string[]>;
+const invertedIndex = invertedIndexData as InvertedIndex;
 
 export function DictionaryView() {
   const [activeTab, setActiveTab] = useState<"kanji" | "jukugo">("kanji");
@@ -32,23 +32,7 @@ export function DictionaryView() {
 
   // ★修正4: 分母の計算ロジックを KanjiListView と統一
   // 「熟語に使われている漢字」ではなく「辞書(ids-map)に載っている全漢字」を対象にする
-  const validKanjiList = useMemo(() => {
-    const usedChars = new Set<string>();
-
-    // 1. レシピの「成果物」を追加 (例: 意, 恵...)
-    Object.keys(idsMap).forEach((key) => usedChars.add(key));
-
-    // 2. レシピの「素材」も追加 (例: 日, 月, 田...)
-    // これを含めないと、原子パーツが分母から漏れてしまう
-    Object.values(idsMap).forEach((parts) => {
-      parts.forEach((char) => usedChars.add(char));
-    });
-
-    // 3. フィルタリング (中間パーツや記号を除外)
-    return Array.from(usedChars)
-      .filter((char) => char.match(/^[一-龠々〆ヵヶ]+$/))
-      .sort();
-  }, []);
+  const validKanjiList = invertedIndex.collection;
 
   const totalKanji = validKanjiList.length;
 
@@ -57,7 +41,7 @@ export function DictionaryView() {
     unlockedIds.includes(k)
   ).length;
 
-  const totalJukugo = jukugoData.length;
+  const totalJukugo = getShardManifest().total;
   const collectedJukugo = unlockedJukugos.length;
 
   const currentCollected =
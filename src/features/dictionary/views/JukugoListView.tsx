@@ -2,12 +2,13 @@
 
 // ★修正1: useGameStore ではなく、図鑑専用の useDictionaryStore を使う
 import { useDictionaryStore } from "@/features/dictionary/stores/dictionarySlice";
-import jukugoDataRaw from "@/features/kanji-core/data/jukugo-db-auto.json";
 import { JukugoDefinition } from "@/features/kanji-core/types";
 import { useState, useMemo } from "react";
 import { motion, AnimatePresence } from "framer-motion";
+import { useAllJukugo } from "../hooks/useAllJukugo";
 
-const jukugoData = jukugoDataRaw as JukugoDefinition[];
+// 読み込み中に渡す空リスト（useMemo の依存が毎回変わらないよう固定）
+const NO_JUKUGO: JukugoDefinition[] = [];
 
 const SYLLABARY_ROWS = [
   { label: "全", value: "all" },
@@ -28,7 +29,8 @@ export function JukugoListView() {
   const unlockedJukugos =
     useDictionaryStore((state) => state.unlockedJukugos) || [];
 
-  const data = jukugoData;
+  const loadedJukugos = useAllJukugo();
+  const data = loadedJukugos ?? NO_JUKUGO;
   const [filterRow, setFilterRow] = useState<string>("all");
   const [selectedJukugo, setSelectedJukugo] = useState<JukugoDefinition | null>(
     null
@@ -136,7 +138,7 @@ export function JukugoListView() {
 
         {filteredJukugos.length === 0 && (
           <div className="col-span-full text-center py-20 text-stone-400 font-serif text-sm">
-            該当する熟語はありません
+            {loadedJukugos ? "該当する熟語はありません" : "読み込み中..."}
           </div>
         )}
       </div>
@@ -3,16 +3,15 @@
 // ★修正1: useGameStore ではなく、図鑑専用の useDictionaryStore を使う
 import { useDictionaryStore } from "@/features/dictionary/stores/dictionarySlice";
 // ★修正2: 熟語データ(jukugo-db)ではなく、合体辞書データ(ids-map)を読み込む
-import idsMapData from "@/features/kanji-core/data/ids-map-auto.json";
-import jukugoDataRaw from "@/features/kanji-core/data/jukugo-db-auto.json";
-import { JukugoDefinition } from "@/features/kanji-core/types";
+// ★修正5: 図鑑の文字一覧・熟語の逆引きは事前生成の転置インデックスを使う
+import invertedIndexData from "@/features/kanji-core/data/inverted-index-auto.json";
+import { InvertedIndex, JukugoDefinition } from "@/features/kanji-core/types";
 import { useMemo, useState } from "react";
 import { motion, AnimatePresence } from "framer-motion";
 import { getDisplayChar } from "@/features/game-board/utils/charDisplay";
+import { useAllJukugo } from "../hooks/useAllJukugo";
 
-const jukugoData = jukugoDataRaw as JukugoDefinition[];
-// 型アサーション (JSONを型に合わせる)
-const idsMap = idsMapData as Record<string, string[]>;
+const invertedIndex = invertedIndexData as InvertedIndex;
 
 export function KanjiListView() {
   // ★修正3: undefined対策の安全策
@@ -20,30 +19,9 @@ export function KanjiListView() {
   const unlockedJukugos =
     useDictionaryStore((state) => state.unlockedJukugos) || [];
 
-  const data = jukugoData;
-
-  // ★修正4: 有効な漢字リストの生成ロジックを「辞書データ」ベースに変更
-  const validKanjiList = useMemo(() => {
-    const usedChars = new Set<string>();
-
-    // 1. 辞書の「キー（作れる漢字）」を全て追加 (例: 意, 恵...)
-    // これが generate_dictionary.py のログに出ていた "841" 個です
-    Object.keys(idsMap).forEach((key) => usedChars.add(key));
-
-    // 2. 辞書の「値（素材パーツ）」も全て追加 (例: 日, 月, 田...)
-    // これを入れないと、レシピを持たない「原子パーツ」が図鑑から消えてしまいます
-    Object.values(idsMap).forEach((parts) => {
-      parts.forEach((char) => usedChars.add(char));
-    });
-
-    // 3. フィルタリング & ソート
-    return (
-      Array.from(usedChars)
-        // 中間パーツ("&..."など)や、記号を除外して、純粋な漢字だけにする
-        .filter((char) => char.match(/^[一-龠々〆ヵヶ]+$/))
-        .sort()
-    );
-  }, []);
+  // ★修正4: 有効な漢字リストは「辞書データ」の成果物＋素材から中間パーツ・記号を除いたもの
+  // （generate_indexes.py が同じ条件で事前に作っている）
+  const validKanjiList = invertedIndex.collection;
 
   const [selectedKanji, setSelectedKanji] = useState<string | null>(null);
 
@@ -88,7 +66,6 @@ export function KanjiListView() {
         {selectedKanji && (
           <KanjiDetailModal
             kanji={selectedKanji}
-            allData={data}
             unlockedIds={unlockedJukugos}
             onClose={() => setSelectedKanji(null)}
           />
@@ -100,18 +77,26 @@ export function KanjiListView() {
 
 function KanjiDetailModal({
   kanji,
-  allData,
   unlockedIds,
   onClose,
 }: {
   kanji: string;
-  allData: JukugoDefinition[];
   unlockedIds: string[];
   onClose: () => void;
 }) {
+  const allJukugo = useAllJukugo();
+  // ID -> 熟語（逆引き結果の表示用）
+  const jukugoById = useMemo(
+    () => new Map((allJukugo ?? []).map((j) => [j.id, j])),
+    [allJukugo]
+  );
+
   const relatedJukugos = useMemo(() => {
-    return allData.filter((item) => item.components.includes(kanji));
-  }, [kanji, allData]);
+    const ids = invertedIndex.byKanji[kanji] || [];
+    return ids
+      .map((id) => jukugoById.get(id))
+      .filter((j): j is JukugoDefinition => j !== undefined);
+  }, [kanji, jukugoById]);
 
   return (
     <div className="fixed inset-0 z-100 flex items-center justify-center p-4">
@@ -180,7 +165,7 @@ function KanjiDetailModal({
               })
             ) : (
               <div className="text-center text-xs text-stone-400 py-4">
-                この漢字を使う熟語はまだありません
+                {allJukugo ? "この漢字を使う熟語はまだありません" : "読み込み中..."}
               </div>
             )}
           </div>
@@ -1,11 +1,11 @@
 import { useEffect, useCallback, useRef } from "react";
 import { useGameStore } from "../stores/store";
 import { generateStageParts } from "@/features/kanji-core/logic/decomposer";
+import { loadDistractorPool } from "@/features/kanji-core/logic/generator";
+import { getShardManifest, loadJukugoById, loadJukugoShard } from "@/features/kanji-core/logic/jukugoShards";
 import { JukugoDefinition } from "@/features/kanji-core/types";
 import { TOTAL_STAGES } from "../stores/slices/stageSlice";
-import jukugoDataRaw from "@/features/kanji-core/data/jukugo-db-auto.json";
 
-const jukugoData = jukugoDataRaw as JukugoDefinition[];
 const HINT_APPEAR_MS = 15000;
 
 export function useLevelSystem() {
@@ -23,8 +23,16 @@ export function useLevelSystem() {
   
   const loadedLevelRef = useRef<number | null>(null);
   const loadedModeRef = useRef<string | null>(null);
+  // 読み込み待ちの間に別のレベルへ移ったら、古い結果は捨てる
+  const loadRequestRef = useRef(0);
+
+  const loadLevel = useCallback(async (index: number) => {
+    const request = ++loadRequestRef.current;
+
+    // ダミー候補のプールを先に読み込む（失敗しても実行時に候補を作って続行できる）
+    await loadDistractorPool().catch(() => null);
+    if (request !== loadRequestRef.current) return;
 
-  const loadLevel = useCallback((index: number) => {
     const state = useGameStore.getState();
     let currentPlaylist = state.playlist;
 
@@ -97,8 +105,9 @@ export function useLevelSystem() {
     }
     // ★★★★★★★★★★★★★★★★★★★★★★★★★★★
 
-    // 3. 通常の検索 (JSONから探す)
-    let targetJukugo = jukugoData.find(j => j.id === targetId);
+    // 3. 通常の検索 (IDの入った難易度帯のシャードだけ読み込んで探す)
+    let targetJukugo = await loadJukugoById(targetId);
+    if (request !== loadRequestRef.current) return;
 
     // データが見つからない場合の自動修復
     if (!targetJukugo) {
@@ -106,13 +115,16 @@ export function useLevelSystem() {
       state.generatePlaylist();
       currentPlaylist = useGameStore.getState().playlist;
       targetId = currentPlaylist[index % currentPlaylist.length];
-      targetJukugo = jukugoData.find(j => j.id === targetId);
+      targetJukugo = await loadJukugoById(targetId);
+      if (request !== loadRequestRef.current) return;
     }
 
     // それでも見つからない場合（最終手段）
     if (!targetJukugo) {
       console.error(`Problem ID not found: ${targetId}`);
-      const fallback = jukugoData[0] || jukugoData[Math.floor(Math.random() * jukugoData.length)];
+      const fallbackData = await loadJukugoShard(getShardManifest().shards[0].name);
+      if (request !== loadRequestRef.current) return;
+      const fallback = fallbackData[0] || fallbackData[Math.floor(Math.random() * fallbackData.length)];
       resetStage();
       setStage(fallback);
       const parts = generateStageParts(fallback, index, state.difficultyMode);
@@ -1,9 +1,7 @@
 import { StateCreator } from 'zustand';
 import { JukugoDefinition, DifficultyMode } from '@/features/kanji-core/types';
 import { BADGES, STAGES_PER_BADGE } from '@/features/collection/data/badges';
-import jukugoDataRaw from '@/features/kanji-core/data/jukugo-db-auto.json';
-
-const jukugoData = jukugoDataRaw as JukugoDefinition[];
+import { jukugoIdsByDifficulty } from '@/features/kanji-core/logic/jukugoShards';
 
 export const TOTAL_STAGES = 405; 
 
@@ -131,12 +129,15 @@ export const createStageSlice: StateCreator<StageSlice> = (set, get) => ({
 
   // ★修正箇所: generatePlaylist
   generatePlaylist: () => {
-    const poolByDiff: Record<number, JukugoDefinition[]> = {};
+    // 難易度ごとのIDはマニフェストにあるので、シャード本体は読み込まない
+    const poolByDiff: Record<number, string[]> = {};
     for (let d = 1; d <= 10; d++) poolByDiff[d] = [];
-    
-    jukugoData.forEach(item => {
-      const diff = Math.min(10, Math.max(1, item.difficulty));
-      poolByDiff[diff].push(item);
+    const allIds: string[] = [];
+
+    Object.entries(jukugoIdsByDifficulty()).forEach(([difficulty, ids]) => {
+      const diff = Math.min(10, Math.max(1, Number(difficulty)));
+      poolByDiff[diff].push(...ids);
+      allIds.push(...ids);
     });
 
     const shuffle = <T>(array: T[]) => {
@@ -154,7 +155,7 @@ export const createStageSlice: StateCreator<StageSlice> = (set, get) => ({
       for (const offset of searchOrder) {
         const d = targetDiff + offset;
         if (d >= 1 && d <= 10 && poolByDiff[d].length > 0) {
-          return poolByDiff[d].pop()!.id;
+          return poolByDiff[d].pop()!;
         }
       }
       return null;
@@ -180,7 +181,7 @@ export const createStageSlice: StateCreator<StageSlice> = (set, get) => ({
 
       const id = popProblem(targetDiff);
       if (!id) {
-        const randomFallback = jukugoData[Math.floor(Math.random() * jukugoData.length)].id;
+        const randomFallback = allIds[Math.floor(Math.random() * allIds.length)];
         newPlaylist.push(randomFallback);
       } else {
         newPlaylist.push(id);
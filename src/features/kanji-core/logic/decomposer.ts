@@ -1,13 +1,16 @@
-import { GamePart, JukugoDefinition, IdsMap, DifficultyMode } from '../types';
+import { GamePart, JukugoDefinition, IdsMap, AtomParts, DifficultyMode } from '../types';
 import idsMapData from '../data/ids-map-auto.json';
+import atomPartsData from '../data/atom-parts-auto.json';
 // generator.ts からダミー生成関数をインポート
-import { getDistractorParts } from './generator';
+import { getDistractorParts, sampleDistractorPool } from './generator';
 
 const IDS_MAP: IdsMap = idsMapData as unknown as IdsMap;
+const ATOM_PARTS: AtomParts = atomPartsData as AtomParts;
 
 const generateId = () => Math.random().toString(36).substring(2, 9);
 
 // 原子パーツ（これ以上分解しない文字）
+// ※ 問題DBの文字は ATOM_PARTS（dictionary_config.json 基準）を使うので、これは手動指定の熟語用のフォールバック
 const ATOMIC_PARTS = new Set([
   "雨", "木", "日", "月", "田", "力", "山", "石", "土", "火", "水", "金", 
   "王", "玉", "貝", "車", "馬", "魚", "鳥", "虫", "犬", "羊", "牛", 
@@ -30,6 +33,13 @@ function decomposeKanji(char: string): string[] {
   return [char];
 }
 
+// 事前計算済みの原子パーツがあればそれを使い、なければ再帰的に分解する
+function getAtomicParts(char: string): string[] {
+  const atoms = ATOM_PARTS[char];
+  if (atoms !== undefined) return atoms.split(' ');
+  return decomposeKanji(char);
+}
+
 /**
  * 外部から呼び出す用: 構成要素を取得（1段階のみ）
  */
@@ -69,17 +79,17 @@ export function generateStageParts(
 
   // 通常ステージ（ステージ4以降）
   else if (mode === 'NORMAL') {
-    // ATOMIC_PARTS に従い分解
-    rawParts = kanjis.flatMap(k => decomposeKanji(k));
+    // 原子パーツまで分解
+    rawParts = kanjis.flatMap(k => getAtomicParts(k));
   }
   // EASYモード
   else {
     rawParts = kanjis.flatMap((k, index) => {
       // 最後の1文字は分解しない（ヒント的に残す）などの処理
-      if (index === kanjis.length - 1 && !ATOMIC_PARTS.has(k)) {
+      if (index === kanjis.length - 1) {
         return [k];
       }
-      return decomposeKanji(k);
+      return getAtomicParts(k);
     });
   }
 
@@ -120,7 +130,9 @@ export function generateStageParts(
   // (個数, 正解パーツリスト) を渡して、まとめて取得します
   let distractors: string[] = [];
   if (distractorCount > 0) {
-    distractors = getDistractorParts(distractorCount, rawParts);
+    // 事前計算済みのプールを優先（なければ従来どおり実行時に候補を作る）
+    distractors = sampleDistractorPool(jukugo.kanji, distractorCount, currentStage)
+      ?? getDistractorParts(distractorCount, rawParts);
   }
 
   // --- 統合とシャッフル ---
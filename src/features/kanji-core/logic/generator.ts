@@ -1,7 +1,10 @@
-import jukugoDataRaw from '../data/jukugo-db-auto.json';
-import { JukugoDefinition, DifficultyMode } from '../types';
+import { JukugoDefinition, DifficultyMode, DistractorPool } from '../types';
+import { getShardManifest, loadJukugoByDifficulty } from './jukugoShards';
 
-const jukugoData = jukugoDataRaw as JukugoDefinition[];
+// 熟語ごとの安全なダミー候補（tools/generate_distractors.py が出力）
+// 初期バンドルに含めないよう、最初に必要になったときに別チャンクとして取得する
+let distractorPool: DistractorPool | null = null;
+let distractorPoolPromise: Promise<DistractorPool> | null = null;
 
 const BLACKLIST_KANJI = ["穏", "隠", "勉"];
 
@@ -51,11 +54,11 @@ const DEFAULT_DISTRACTORS = [
   "一", "二", "三", "十", "日", "月", "木", "人", "口", "目", "田", "力"
 ];
 
-export function generateRandomStage(
+export async function generateRandomStage(
   levelIndex: number, 
   excludeIds: string[] = [], 
   mode: DifficultyMode = 'NORMAL'
-): JukugoDefinition {
+): Promise<JukugoDefinition> {
   
   // ▼▼▼ チュートリアル固定ステージ (あなたのコードを維持) ▼▼▼
 
@@ -105,22 +108,28 @@ export function generateRandomStage(
   const currentStage = levelIndex + 1;
   let candidates: JukugoDefinition[] = [];
 
-  // ブラックリスト除外済みのデータを用意
-  const validData = jukugoData.filter(j => 
+  // ブラックリスト除外（問題データは必要な難易度帯のシャードだけ読み込む）
+  const isValid = (j: JukugoDefinition) =>
     !BLACKLIST_KANJI.includes(j.kanji) &&
-    !j.components.some(c => BLACKLIST_KANJI.some(bk => c.includes(bk)))
-  );
+    !j.components.some(c => BLACKLIST_KANJI.some(bk => c.includes(bk)));
+  const loadValid = async (minDiff: number, maxDiff: number) =>
+    (await loadJukugoByDifficulty(minDiff, maxDiff)).filter(isValid);
+  // 全難易度から選ぶとき: 件数の比で難易度帯を1つ選び、その帯のシャードだけ読み込む
+  const loadValidFromRandomBand = async () => {
+    const { total, shards } = getShardManifest();
+    let r = Math.random() * total;
+    const shard = shards.find(s => (r -= s.count) < 0) ?? shards[shards.length - 1];
+    return loadValid(shard.difficulty[0], shard.difficulty[1]);
+  };
 
   if (mode === 'EASY') {
     // 【初級】常に簡単 (文字数少なめ、難易度低)
-    candidates = validData.filter(j => 
-      j.components.length <= 2 && j.difficulty <= 3
-    );
+    candidates = (await loadValid(1, 3)).filter(j => j.components.length <= 2);
   } else {
     // 【標準】
     // ステージ10以降は、難易度制限なしでランダム出題
     if (currentStage >= 10) {
-       candidates = validData;
+       candidates = await loadValidFromRandomBand();
     } 
     else {
       // ステージ4〜9: 段階的に難しくする
@@ -140,7 +149,7 @@ export function generateRandomStage(
         maxDiff = 5;
       }
       
-      candidates = validData.filter(j => j.difficulty >= minDiff && j.difficulty <= maxDiff);
+      candidates = await loadValid(minDiff, maxDiff);
     }
   }
 
@@ -149,8 +158,8 @@ export function generateRandomStage(
   if (freshCandidates.length > 0) {
     candidates = freshCandidates;
   } else if (candidates.length === 0) {
-    // 候補が尽きたら全データから再抽選
-    candidates = validData;
+    // 候補が尽きたら別の難易度帯から再抽選
+    candidates = await loadValidFromRandomBand();
   }
   
   // 安全策: それでも空ならフォールバック
@@ -212,6 +221,49 @@ export function getDistractorParts(count: number, correctParts: string[]): strin
   return result;
 }
 
+/**
+ * ダミー候補のプールを読み込む（同じファイルは1回だけ取得する）
+ * generateStageParts() の前に await しておくと、sampleDistractorPool() がプールを使える
+ */
+export function loadDistractorPool(): Promise<DistractorPool> {
+  if (!distractorPoolPromise) {
+    distractorPoolPromise = import('../data/distractor-pool-auto.json').then(mod => {
+      distractorPool = mod.default as DistractorPool;
+      return distractorPool;
+    });
+  }
+  return distractorPoolPromise;
+}
+
+/**
+ * 事前計算済みのダミー候補から選ぶ（問題DBの熟語用）
+ * 候補はどれも正解パーツ・途中の文字・他の候補と合体しないことを確認済みなので、選ぶだけでOK
+ * 後半のステージほど紛らわしい段階から使う（0: 見た目, 1: 構造, 2: 汎用）
+ * プールがない熟語（チュートリアルなど）や、プールをまだ読み込んでいないときは null を返す
+ */
+export function sampleDistractorPool(kanji: string, count: number, currentStage: number): string[] | null {
+  const tiers = distractorPool?.[kanji];
+  if (!tiers) return null;
+
+  let order = [2, 1, 0];
+  if (currentStage >= 30) {
+    order = [0, 1, 2];
+  } else if (currentStage >= 20) {
+    order = [1, 0, 2];
+  }
+
+  const result: string[] = [];
+  for (const tier of order) {
+    const candidates = tiers[tier] ? tiers[tier].split(' ') : [];
+    while (result.length < count && candidates.length > 0) {
+      const idx = Math.floor(Math.random() * candidates.length);
+      result.push(candidates[idx]);
+      candidates.splice(idx, 1);
+    }
+  }
+  return result;
+}
+
 // 古い関数（もう使わないので削除しても良いですが、念のため互換性として残すなら空配列を返す）
 export function getRandomDistractors(count: number, exclude: string[]): string[] {
   return getDistractorParts(count, exclude);
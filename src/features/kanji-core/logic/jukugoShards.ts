@@ -0,0 +1,104 @@
+import manifestRaw from '../data/shards/manifest.json';
+import { JukugoDefinition, JukugoShardManifest } from '../types';
+
+// 難易度帯ごとに分割した問題DB（tools/generate_problems.py が出力）
+// マニフェストだけを静的に読み込み、シャード本体は必要になったときに取得する
+const MANIFEST = manifestRaw as JukugoShardManifest;
+
+// バンドラーがシャードごとに別チャンクへ分けられるよう、import のパスは静的に書く
+// ※ generate_problems.py の DIFFICULTY_BANDS を変えたらここも合わせる
+const SHARD_LOADERS: Record<string, () => Promise<{ default: unknown }>> = {
+  "d1-3": () => import('../data/shards/jukugo-d1-3.json'),
+  "d4-5": () => import('../data/shards/jukugo-d4-5.json'),
+  "d6-10": () => import('../data/shards/jukugo-d6-10.json'),
+};
+
+const shardCache = new Map<string, Promise<JukugoDefinition[]>>();
+
+export function getShardManifest(): JukugoShardManifest {
+  return MANIFEST;
+}
+
+// ID -> シャード名（最初に引かれたときにマニフェストから作る）
+let shardById: Map<string, string> | null = null;
+
+/**
+ * 熟語IDが入っているシャード名を返す（マニフェストにないIDは null）
+ */
+export function shardForId(id: string): string | null {
+  if (!shardById) {
+    shardById = new Map();
+    for (const shard of MANIFEST.shards) {
+      for (const ids of Object.values(shard.ids)) {
+        ids.forEach(jukugoId => shardById!.set(jukugoId, shard.name));
+      }
+    }
+  }
+  return shardById.get(id) ?? null;
+}
+
+/**
+ * 難易度 -> 熟語ID（マニフェストだけで作れるので、シャード本体は読み込まない）
+ */
+export function jukugoIdsByDifficulty(): Record<number, string[]> {
+  const result: Record<number, string[]> = {};
+  for (const shard of MANIFEST.shards) {
+    for (const [diff, ids] of Object.entries(shard.ids)) {
+      const d = Number(diff);
+      if (!result[d]) result[d] = [];
+      result[d].push(...ids);
+    }
+  }
+  return result;
+}
+
+/**
+ * 難易度の範囲にかかるシャード名を返す（generateRandomStage の minDiff / maxDiff をそのまま渡せる）
+ */
+export function shardsForDifficulty(minDiff: number, maxDiff: number): string[] {
+  return MANIFEST.shards
+    .filter(s => s.difficulty[0] <= maxDiff && s.difficulty[1] >= minDiff)
+    .map(s => s.name);
+}
+
+/**
+ * シャードを読み込む（同じシャードは1回だけ取得する）
+ */
+export function loadJukugoShard(name: string): Promise<JukugoDefinition[]> {
+  const cached = shardCache.get(name);
+  if (cached) return cached;
+
+  const loader = SHARD_LOADERS[name];
+  if (!loader) return Promise.reject(new Error(`Unknown jukugo shard: ${name}`));
+
+  const promise = loader().then(mod => mod.default as JukugoDefinition[]);
+  shardCache.set(name, promise);
+  return promise;
+}
+
+/**
+ * IDの熟語を読み込む（その熟語が入っている難易度帯のシャードだけを取得する。見つからなければ null）
+ */
+export async function loadJukugoById(id: string): Promise<JukugoDefinition | null> {
+  const name = shardForId(id);
+  if (!name) return null;
+  const shard = await loadJukugoShard(name);
+  return shard.find(j => j.id === id) ?? null;
+}
+
+/**
+ * すべてのシャードを読み込む（図鑑の一覧など、全件が要るとき用。難易度帯の順に並ぶ）
+ * ※ ゲーム中は loadJukugoById() で必要な帯だけ読み込む
+ */
+export async function loadAllJukugo(): Promise<JukugoDefinition[]> {
+  const shards = await Promise.all(MANIFEST.shards.map(s => loadJukugoShard(s.name)));
+  return shards.flat();
+}
+
+/**
+ * 難易度の範囲に入る熟語をまとめて読み込む
+ */
+export async function loadJukugoByDifficulty(minDiff: number, maxDiff: number): Promise<JukugoDefinition[]> {
+  const shards = await Promise.all(shardsForDifficulty(minDiff, maxDiff).map(loadJukugoShard));
+  return shards.flat().filter(j => j.difficulty >= minDiff && j.difficulty <= maxDiff);
+}
@@ -1,28 +1,23 @@
-import { MergeResult, IdsMap } from '../types';
-// ★修正: 自動生成された辞書を読み込む
-import idsMapData from '../data/ids-map-auto.json';
+import { MergeResult, MergeIndex } from '../types';
+// ★修正: 辞書から事前生成したペア索引を読み込む（tools/generate_dictionary.py が出力）
+import mergeIndexData from '../data/merge-index-auto.json';
 
-const IDS_MAP: IdsMap = idsMapData as unknown as IdsMap;
+const MERGE_INDEX: MergeIndex = mergeIndexData as unknown as MergeIndex;
 
-export function judgeMerge(charA: string, charB: string): MergeResult {
-  for (const [targetKanji, parts] of Object.entries(IDS_MAP)) {
-    // データが配列でない、または要素数が2でない場合はスキップ
-    if (!Array.isArray(parts) || parts.length !== 2) continue;
-
-    const [p1, p2] = parts;
+// 順不同ペアのキー（生成側の merge_key と同じ規則: UTF-16 の並び順で "A+B"）
+function mergeKey(charA: string, charB: string): string {
+  return charA < charB ? `${charA}+${charB}` : `${charB}+${charA}`;
+}
 
-    // 順不同で一致チェック
-    const isMatch = 
-      (p1 === charA && p2 === charB) || 
-      (p1 === charB && p2 === charA);
+export function judgeMerge(charA: string, charB: string): MergeResult {
+  const targetKanji = MERGE_INDEX[mergeKey(charA, charB)];
 
-    if (isMatch) {
-      return {
-        success: true,
-        newChar: targetKanji,
-        soundType: 'KANJI'
-      };
-    }
+  if (targetKanji) {
+    return {
+      success: true,
+      newChar: targetKanji,
+      soundType: 'KANJI'
+    };
   }
 
   return { success: false, reason: 'INVALID_COMBINATION' };
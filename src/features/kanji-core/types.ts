@@ -27,6 +27,7 @@ export interface JukugoDefinition {
   kanji: string;
   reading: string;
   difficulty: number;
+  merges?: number; // 全部の文字を原子パーツから作る最小の合体回数（問題DBのみ。チュートリアルにはない）
   components: string[];
   meaning?: string;
   // ▼ 追加: 穴埋め用の文章
@@ -34,9 +35,47 @@ export interface JukugoDefinition {
   sentence?: string; 
 }
 
+// 文字 -> 原子パーツ（空白区切り、tools/generate_problems.py が問題DBの文字について出力）
+export interface AtomParts {
+  [char: string]: string;
+}
+
+// 難易度帯ごとに分割した問題DBのマニフェスト
+export interface JukugoShardInfo {
+  name: string;
+  file: string;
+  difficulty: [number, number]; // この帯に入る難易度（両端を含む）
+  count: number;
+  bytes: number;
+  sha256: string;
+  ids: Record<string, string[]>; // 難易度 -> この帯の熟語ID（ソースの並び。プレイリスト作成と ID からのシャード選択に使う）
+}
+
+export interface JukugoShardManifest {
+  total: number;
+  shards: JukugoShardInfo[];
+}
+
+// 図鑑用の転置インデックス（tools/generate_indexes.py が出力）
+// 部品・読みからの逆引きはツール用として別ファイル（tools/.cache/tooling-index.json）に出している
+export interface InvertedIndex {
+  collection: string[];                     // 図鑑に載せる文字（コード順）
+  byKanji: Record<string, string[]>;        // 漢字 -> それを含む熟語ID（ソースの並び）
+}
+
+// 熟語（表記） -> 段階ごとのダミー候補（空白区切り、[見た目, 構造, 汎用]）
+export interface DistractorPool {
+  [kanji: string]: string[];
+}
+
 // 分解辞書型
 export interface IdsMap {
   [key: string]: string[];
 }
 
+// 合体索引型（順不同ペア "A+B" -> 合体結果）
+export interface MergeIndex {
+  [pairKey: string]: string;
+}
+
 export type DifficultyMode = 'EASY' | 'NORMAL';
\ No newline at end of file
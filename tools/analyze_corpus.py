@@ -0,0 +1,351 @@
+import argparse
+import json
+import os
+import sys
+import time
+from array import array
+from collections import Counter
+from itertools import accumulate, chain, combinations, combinations_with_replacement
+
+from generate_problems import (
+    DIFFICULTY_BANDS, DIFFICULTY_COST_THRESHOLDS, OUTPUT_ATOMS_FILE, OUTPUT_COST_FILE, OUTPUT_DB_FILE, attach_atoms,
+)
+
+# numpy は任意（pip install numpy）。入っていれば大きな問題DBの集計が速くなる
+# なければ標準ライブラリで同じ集計をする（結果が同じことは --check-backends で確かめられる）
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# ==========================================
+# 設定
+# ==========================================
+# 上位何件を表示・出力するか
+TOP_N = 15
+# 難易度帯ごとの目標比率（DIFFICULTY_BANDS と同じ順）
+DEFAULT_BAND_TARGET = (1, 1, 1)
+# 閾値の候補の上限（原子パーツ数）
+MAX_THRESHOLD = 12
+
+class CorpusArrays:
+    """
+    問題DBを整数にした配列（CSR）
+    熟語 -> 構成文字の番号、構成文字 -> 原子パーツの番号 の2段にする
+    （同じ文字の原子パーツはどの熟語でも同じなので、文字ごとに1回だけ持つ）
+    """
+    def __init__(self, jukugo_db, atomic_costs):
+        # 文字 -> 原子パーツ（空白区切り）。同じ文字の原子パーツはどの熟語でも同じ
+        groups = {}
+        for j in jukugo_db:
+            groups.update(zip(j["components"], j.get("atoms") or j["components"]))
+
+        # 語彙は文字順に番号を振る（同数のときの並びを入力順によらず揃えるため）
+        self.chars = sorted(groups)
+        char_ids = {c: i for i, c in enumerate(self.chars)}
+        self.difficulty = array("i", (j["difficulty"] for j in jukugo_db))
+        self.comp_ids = array("i", map(char_ids.__getitem__, chain.from_iterable(j["components"] for j in jukugo_db)))
+        self.comp_offsets = array("i", accumulate((len(j["components"]) for j in jukugo_db), initial=0))
+        self.char_costs = array("i", (atomic_costs.get(c, 1) for c in self.chars))
+        self.comp_costs = array("i", map(self.char_costs.__getitem__, self.comp_ids))
+
+        char_atoms = [groups[c].split(" ") for c in self.chars]
+        flat = list(chain.from_iterable(char_atoms))
+        self.atoms = sorted(set(flat))
+        atom_ids = {a: i for i, a in enumerate(self.atoms)}
+        self.char_atom_ids = array("i", map(atom_ids.__getitem__, flat))
+        self.char_atom_offsets = array("i", accumulate(map(len, char_atoms), initial=0))
+
+    def __len__(self):
+        return len(self.difficulty)
+
+def as_np(values):
+    """array をコピーせずに numpy 配列として見る"""
+    return np.frombuffer(values, dtype=np.int32) if len(values) else np.zeros(0, dtype=np.int32)
+
+def lengths(offsets):
+    if np is not None:
+        return np.diff(as_np(offsets)).tolist()
+    return [offsets[i + 1] - offsets[i] for i in range(len(offsets) - 1)]
+
+def histogram(values, size=None):
+    """値 -> 件数（0件の値は含めない）"""
+    if np is not None:
+        counts = np.bincount(as_np(values) if isinstance(values, array) else np.asarray(values, dtype=np.int64),
+                             minlength=size or 0)
+        return {int(v): int(n) for v, n in enumerate(counts) if n}
+    return dict(sorted(Counter(values).items()))
+
+def atom_counts(corpus):
+    """熟語ごとの原子パーツ数（構成文字ごとの原子パーツ数を足す）"""
+    per_char = lengths(corpus.char_atom_offsets)
+    if np is not None and len(corpus):
+        sizes = np.asarray(per_char, dtype=np.int64)[as_np(corpus.comp_ids)]
+        cumsum = np.concatenate([[0], np.cumsum(sizes)])
+        offsets = as_np(corpus.comp_offsets)
+        return (cumsum[offsets[1:]] - cumsum[offsets[:-1]]).tolist()
+    return [
+        sum(per_char[i] for i in corpus.comp_ids[corpus.comp_offsets[e]:corpus.comp_offsets[e + 1]])
+        for e in range(len(corpus))
+    ]
+
+def top_usage(corpus):
+    """原子パーツごとの使用回数の上位（文字の出現回数 × その文字の原子パーツ）"""
+    if np is not None and len(corpus):
+        char_counts = np.bincount(as_np(corpus.comp_ids), minlength=len(corpus.chars))
+        weights = np.repeat(char_counts, lengths(corpus.char_atom_offsets))
+        counts = np.bincount(as_np(corpus.char_atom_ids), weights=weights, minlength=len(corpus.atoms)).astype(np.int64)
+        order = np.lexsort((np.arange(len(counts)), -counts))[:TOP_N]
+        return [(corpus.atoms[i], int(counts[i])) for i in order if counts[i]]
+    char_counts = Counter(corpus.comp_ids)
+    counts = Counter()
+    for c, n in char_counts.items():
+        for a in corpus.char_atom_ids[corpus.char_atom_offsets[c]:corpus.char_atom_offsets[c + 1]]:
+            counts[a] += n
+    return [(corpus.atoms[i], n) for i, n in sorted(counts.items(), key=lambda x: (-x[1], x[0]))[:TOP_N]]
+
+def top_cooccurrence(corpus):
+    """同じ熟語に入っている構成文字のペアの上位（順不同・同じ文字同士のペアは数えない）"""
+    v = len(corpus.chars)
+    if np is not None and len(corpus):
+        ids = as_np(corpus.comp_ids).astype(np.int64)
+        starts = as_np(corpus.comp_offsets)[:-1]
+        lens = np.diff(as_np(corpus.comp_offsets))
+        codes = []
+        for n in np.unique(lens):
+            if n < 2: continue
+            rows = starts[lens == n]
+            for i, k in combinations(range(n), 2):
+                a, b = ids[rows + i], ids[rows + k]
+                distinct = a != b
+                a, b = a[distinct], b[distinct]
+                codes.append(np.minimum(a, b) * v + np.maximum(a, b))
+        if not codes:
+            return []
+        pairs, counts = np.unique(np.concatenate(codes), return_counts=True)
+        order = np.lexsort((pairs, -counts))[:TOP_N]
+        return [(corpus.chars[pairs[i] // v], corpus.chars[pairs[i] % v], int(counts[i])) for i in order]
+
+    counts = Counter()
+    for e in range(len(corpus)):
+        row = corpus.comp_ids[corpus.comp_offsets[e]:corpus.comp_offsets[e + 1]]
+        counts.update(min(a, b) * v + max(a, b) for a, b in combinations(row, 2) if a != b)
+    return [(corpus.chars[code // v], corpus.chars[code % v], n)
+            for code, n in sorted(counts.items(), key=lambda x: (-x[1], x[0]))[:TOP_N]]
+
+def cost_spread(costs):
+    """構成文字の原子パーツ数の分布（パーセンタイルは最近順位法で、numpy の有無によらず同じ値）"""
+    if not len(costs):
+        return {}
+    ordered = np.sort(as_np(costs)).tolist() if np is not None else sorted(costs)
+    n = len(ordered)
+
+    def rank(p):
+        return ordered[max(0, -(-p * n // 100) - 1)]
+
+    return {
+        "min": ordered[0],
+        "p25": rank(25),
+        "p50": rank(50),
+        "p75": rank(75),
+        "p90": rank(90),
+        "max": ordered[-1],
+        "mean": round(sum(ordered) / n, 3),
+    }
+
+# ==========================================
+# 難易度の閾値の見直し
+# ==========================================
+def band_of(score):
+    for i, (_, lo, hi) in enumerate(DIFFICULTY_BANDS):
+        if lo <= score <= hi:
+            return i
+    return len(DIFFICULTY_BANDS) - 1
+
+def threshold_counts(corpus, candidates):
+    """
+    熟語ごとに「原子パーツ数が t 以上の構成文字の数」を閾値候補 t ごとに数える
+    戻り値: (文字数, 候補ごとの件数) の組 -> 熟語数（同じ組の熟語はまとめて評価する）
+    """
+    if np is not None and len(corpus):
+        costs = as_np(corpus.comp_costs)
+        offsets = as_np(corpus.comp_offsets)
+        lens = np.diff(offsets)
+        over = (costs[:, None] >= np.asarray(candidates)[None, :]).astype(np.int32)
+        # 空の熟語があると reduceat がずれるので、累積和の差で数える
+        cumsum = np.vstack([np.zeros((1, len(candidates)), dtype=np.int64), np.cumsum(over, axis=0)])
+        per_entry = cumsum[offsets[1:]] - cumsum[offsets[:-1]]
+        # 行ごとの (文字数, 件数...) を1つの整数にまとめてから数える（行単位の unique より速い）
+        base = int(lens.max()) + 1
+        columns = np.column_stack([lens, per_entry]).astype(np.int64)
+        codes = columns @ (base ** np.arange(columns.shape[1], dtype=np.int64))
+        uniq, first, counts = np.unique(codes, return_index=True, return_counts=True)
+        return {tuple(int(x) for x in columns[i]): int(n) for i, n in zip(first, counts)}
+
+    # 候補の最大値を超えるコストは区別しなくてよいので、丸めた並びでまとめてから数える
+    cap = candidates[-1]
+    rows = Counter(
+        tuple(sorted(min(c, cap) for c in corpus.comp_costs[corpus.comp_offsets[e]:corpus.comp_offsets[e + 1]]))
+        for e in range(len(corpus))
+    )
+    signatures = Counter()
+    for row, n in rows.items():
+        signatures[(len(row), *(sum(1 for c in row if c >= t) for t in candidates))] += n
+    return dict(signatures)
+
+def band_counts(signatures, indexes):
+    """閾値（候補の番号の組）で難易度を付け直したときの帯ごとの件数と EASY 候補数"""
+    bands = [0] * len(DIFFICULTY_BANDS)
+    easy = 0
+    for sig, n in signatures.items():
+        score = min(10, max(1, sig[0] + sum(sig[1 + i] for i in indexes)))
+        bands[band_of(score)] += n
+        # generator.ts の EASY: 2文字以下かつ難易度3以下
+        if sig[0] <= 2 and score <= 3:
+            easy += n
+    return bands, easy
+
+def calibrate(corpus, target=DEFAULT_BAND_TARGET):
+    """
+    加点の閾値の組（同じ値を重ねると加点が増える）をすべて試し、帯ごとの比率が目標に最も近いものを選ぶ
+    同じくらい近いなら現在の閾値に近いものを優先する
+    """
+    max_cost = max(corpus.char_costs, default=1)
+    # 現在の閾値が範囲外（コーパスの最大値より大きい等）でも評価できるよう、候補に必ず含める
+    candidates = sorted(set(range(2, max(min(max_cost, MAX_THRESHOLD), 4) + 1)) | set(DIFFICULTY_COST_THRESHOLDS))
+    signatures = threshold_counts(corpus, candidates)
+    total = max(1, len(corpus))
+    share = [t / sum(target) for t in target]
+    current = tuple(candidates.index(t) for t in DIFFICULTY_COST_THRESHOLDS)
+
+    def evaluate(indexes):
+        bands, easy = band_counts(signatures, indexes)
+        error = sum((b / total - s) ** 2 for b, s in zip(bands, share))
+        distance = sum(abs(candidates[i] - candidates[c]) for i, c in zip(indexes, current))
+        return round(error, 9), distance, bands, easy
+
+    best = min(combinations_with_replacement(range(len(candidates)), len(current)), key=lambda ix: evaluate(ix)[:2])
+    _, _, current_bands, current_easy = evaluate(current)
+    error, _, bands, easy = evaluate(best)
+    return {
+        "target_share": [round(s, 3) for s in share],
+        "current": {"thresholds": list(DIFFICULTY_COST_THRESHOLDS), "bands": current_bands, "easy": current_easy},
+        "suggested": {"thresholds": [candidates[i] for i in best], "bands": bands, "easy": easy,
+                      "error": error},
+    }
+
+def analyze(jukugo_db, atomic_costs, target=DEFAULT_BAND_TARGET):
+    corpus = CorpusArrays(jukugo_db, atomic_costs)
+    return {
+        "entries": len(corpus),
+        "backend": "numpy" if np is not None else "stdlib",
+        "difficulty": histogram(corpus.difficulty, 11),
+        "components": histogram(lengths(corpus.comp_offsets)),
+        "atoms": histogram(atom_counts(corpus)),
+        "atomic_cost": {"spread": cost_spread(corpus.comp_costs), "histogram": histogram(corpus.comp_costs)},
+        "part_usage": top_usage(corpus),
+        "cooccurrence": top_cooccurrence(corpus),
+        "calibration": calibrate(corpus, target),
+    }
+
+def compare_backends(jukugo_db, atomic_costs, target=DEFAULT_BAND_TARGET):
+    """
+    numpy 版と標準ライブラリ版で集計し、結果が違う項目を返す（numpy がなければ None）
+    JSON に書き出したときの形で比べる（タプルとリストなどの違いは無視する）
+    """
+    global np
+    if np is None:
+        return None
+
+    def normalized(report):
+        return {k: json.loads(json.dumps(v)) for k, v in report.items() if k != "backend"}
+
+    numpy_report = normalized(analyze(jukugo_db, atomic_costs, target))
+    saved, np = np, None
+    try:
+        stdlib_report = normalized(analyze(jukugo_db, atomic_costs, target))
+    finally:
+        np = saved
+    return [key for key in numpy_report if numpy_report[key] != stdlib_report[key]]
+
+def print_report(report):
+    def bar(counts):
+        peak = max(counts.values(), default=1)
+        for value, n in counts.items():
+            print(f"   {value:>3}: {'█' * max(1, round(n / peak * 30))} {n}")
+
+    print(f"📊 問題DB: {report['entries']:,} 件（集計: {report['backend']}）")
+    print("🎚 難易度:")
+    bar(report["difficulty"])
+    print("🔢 構成文字数:")
+    bar(report["components"])
+    print("🧱 原子パーツ数:")
+    bar(report["atoms"])
+    spread = report["atomic_cost"]["spread"]
+    if spread:
+        print(f"📐 構成文字の原子パーツ数: 最小 {spread['min']} / 中央 {spread['p50']} / p90 {spread['p90']} / 最大 {spread['max']}（平均 {spread['mean']}）")
+    print(f"🔝 よく使われる原子パーツ: {' '.join(f'{p}({n})' for p, n in report['part_usage'])}")
+    print(f"🤝 よく一緒に出る文字: {' '.join(f'{a}{b}({n})' for a, b, n in report['cooccurrence'])}")
+
+    cal = report["calibration"]
+    names = [name for name, _, _ in DIFFICULTY_BANDS]
+
+    def bands(info):
+        return " / ".join(f"{name} {n}" for name, n in zip(names, info["bands"]))
+
+    print("⚖️ 難易度の加点閾値（原子パーツ数）:")
+    print(f"   現在 {cal['current']['thresholds']}: {bands(cal['current'])}（EASY 候補 {cal['current']['easy']}）")
+    print(f"   提案 {cal['suggested']['thresholds']}: {bands(cal['suggested'])}（EASY 候補 {cal['suggested']['easy']}）")
+    if cal["suggested"]["thresholds"] == cal["current"]["thresholds"]:
+        print("   ✅ 現在の閾値が目標の比率に最も近いです。")
+    else:
+        print("   💡 generate_problems.py の DIFFICULTY_COST_THRESHOLDS を見直してください。")
+
+def load_json(filepath):
+    if not os.path.exists(filepath):
+        return None
+    with open(filepath, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="問題DBの分布を集計し、難易度の加点閾値の見直し案を出す")
+    parser.add_argument("--db", default=OUTPUT_DB_FILE, help="集計する問題DB（既定: jukugo-db-auto.json）")
+    parser.add_argument("--target", type=float, nargs=len(DIFFICULTY_BANDS), default=DEFAULT_BAND_TARGET,
+                        metavar="W", help="難易度帯ごとの目標比率（d1-3 d4-5 d6-10 の順）")
+    parser.add_argument("--json", metavar="PATH", help="集計結果を JSON で書き出す")
+    parser.add_argument("--check-backends", action="store_true",
+                        help="numpy 版と標準ライブラリ版の集計結果が一致するか確かめる（numpy が必要）")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    jukugo_db = load_json(args.db)
+    atomic_costs = load_json(OUTPUT_COST_FILE)
+    if jukugo_db is None or atomic_costs is None:
+        print("❌ jukugo-db-auto.json / atomic-cost-auto.json が見つかりません。先に生成してください。")
+        return
+    attach_atoms(jukugo_db, load_json(OUTPUT_ATOMS_FILE) or {})
+
+    start = time.perf_counter()
+    report = analyze(jukugo_db, atomic_costs, tuple(args.target))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print_report(report)
+    print(f"⏱️ 集計: {elapsed_ms:.0f}ms")
+
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if args.check_backends:
+        mismatched = compare_backends(jukugo_db, atomic_costs, tuple(args.target))
+        if mismatched is None:
+            print("⚠️ numpy が入っていないので、集計方法の比較はスキップしました（pip install numpy）")
+        elif mismatched:
+            print(f"❌ numpy 版と標準ライブラリ版で結果が違います: {', '.join(mismatched)}")
+            sys.exit(1)
+        else:
+            print("✅ numpy 版と標準ライブラリ版の集計結果は一致しています。")
+
+if __name__ == "__main__":
+    main()
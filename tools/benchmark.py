@@ -0,0 +1,270 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import generate_dictionary
+import generate_problems
+from analyze_corpus import analyze
+from ids_graph import CsrGraph
+from ids_index import IdsIndex, build_index, parse_ids_file
+
+# ==========================================
+# 設定
+# ==========================================
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_FILE = os.path.join(CURRENT_DIR, "benchmark_baseline.json")
+
+DEFAULT_IDS_SIZES = [10_000, 50_000, 200_000]
+DEFAULT_JUKUGO_SIZES = [1_000, 10_000, 100_000]
+
+# 合成データ用: 葉になる部品と、合成漢字に割り当てるコードポイント（CJK拡張B〜）
+LEAF_PARTS = list("日月木山石田土火水金力目口人女子言糸車門雨貝馬魚鳥虫王弓矢刀牛手心一二三十大小")
+SYNTHETIC_START = 0x20000
+IDC_2 = "⿰⿱"
+IDC_3 = "⿲⿳"
+
+# 計測誤差で劣化扱いにしないための最小差分
+MIN_DELTA = {"seconds": 0.005, "peak_kb": 64}
+
+# ==========================================
+# 合成コーパス
+# ==========================================
+def synthetic_chars(count):
+    return [chr(SYNTHETIC_START + i) for i in range(count)]
+
+def write_synthetic_ids(path, count, seed=0):
+    """
+    ids.txt と同じ形式の合成データを書き出す
+    構成要素は既出の文字から選ぶ（最近の文字ほど選ばれにくい＝共有の多い部品が生まれる）ので、
+    部品の共有と分解の深さが実データに近い形で増えていく
+    """
+    rng = random.Random(seed)
+    chars = synthetic_chars(count)
+    pool = list(LEAF_PARTS)
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(";; synthetic IDS corpus\n")
+        for i, char in enumerate(chars):
+            n = 3 if rng.random() < 0.2 else 2
+            # 2乗で偏らせて、前半（浅く、よく使われる部品）を選びやすくする
+            comps = [pool[int(len(pool) * rng.random() ** 2)] for _ in range(n)]
+            idc = rng.choice(IDC_3 if n == 3 else IDC_2)
+            f.write(f"U+{ord(char):04X}\t{char}\t{idc}{''.join(comps)}\n")
+            pool.append(char)
+    return chars
+
+def write_synthetic_jukugo(path, count, chars, seed=0):
+    """jukugo_source.txt と同じ形式（熟語,よみ,意味,例文）の合成データを書き出す"""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("# synthetic jukugo corpus\n")
+        for i in range(count):
+            length = rng.choice([2, 2, 2, 3, 4])
+            word = "".join(rng.choice(chars) for _ in range(length))
+            f.write(f"{word},よみ{i},意味{i},例文の{{{{target}}}}です。\n")
+
+# ==========================================
+# 計測
+# ==========================================
+def measure(func, repeat):
+    """
+    func を repeat 回実行して最速の時間を測り、最後に tracemalloc でピークメモリを測る
+    （tracemalloc は遅くなるので時間計測とは別に1回だけ回す）
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {"seconds": round(best, 6), "peak_kb": round(peak / 1024, 1)}
+
+def quiet(func):
+    """ツール側の進捗表示を抑えて呼び出す"""
+    def wrapper():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return func()
+    return wrapper
+
+def bench_ids(workdir, size, repeat):
+    ids_path = os.path.join(workdir, f"ids-{size}.txt")
+    index_path = os.path.join(workdir, f"ids-{size}.bin")
+    chars = write_synthetic_ids(ids_path, size)
+    results = {}
+
+    ids_db, results["parse_ids_file"] = measure(lambda: parse_ids_file(ids_path), repeat)
+    _, results["index_build"] = measure(quiet(lambda: build_index(ids_path, index_path)), repeat)
+    # 索引は開くだけなら一瞬なので、全文字を1回ずつ引くまでの時間も測る（フルパースと比べるのはこちら）
+    _, results["index_open"] = measure(lambda: IdsIndex(index_path), repeat)
+
+    def index_full_lookup():
+        db = IdsIndex(index_path)
+        return sum(len(db[c]) for c in db)
+    _, results["index_full_lookup"] = measure(index_full_lookup, repeat)
+
+    atomic_parts = set(LEAF_PARTS)
+    allowed_set = atomic_parts | set(chars)
+
+    def decompose():
+        engine = generate_dictionary.DecompositionEngine(ids_db, allowed_set, atomic_parts)
+        return engine.decompose_all(chars)
+    _, results["decompose"] = measure(decompose, repeat)
+
+    def end_to_end():
+        db = IdsIndex(index_path)
+        engine = generate_dictionary.DecompositionEngine(db, allowed_set, atomic_parts)
+        return engine.decompose_all(chars)
+    _, results["end_to_end"] = measure(end_to_end, repeat)
+
+    # 同じグラフを整数配列（CSR）で持った場合
+    graph, results["csr_build"] = measure(lambda: CsrGraph.from_mapping(ids_db), repeat)
+    _, results["csr_atomic_costs"] = measure(graph.atomic_costs, repeat)
+    _, results["csr_reachable"] = measure(lambda: graph.reachable(atomic_parts), repeat)
+
+    def csr_decompose():
+        engine = generate_dictionary.DecompositionEngine(CsrGraph.from_index(IdsIndex(index_path)), allowed_set, atomic_parts)
+        return engine.decompose_all(chars)
+    _, results["csr_decompose"] = measure(csr_decompose, repeat)
+
+    return chars, ids_db, results
+
+def bench_jukugo(workdir, size, chars, ids_map, repeat):
+    src_path = os.path.join(workdir, f"jukugo-{size}.txt")
+    write_synthetic_jukugo(src_path, size, chars)
+    results = {}
+
+    words = []
+    with open(src_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("#"): continue
+            words.append(line.split(",")[0])
+
+    atomic_costs, results["atomic_cost_table"] = measure(
+        lambda: generate_problems.build_atomic_cost_table(ids_map)[0], repeat
+    )
+
+    merge_plans, results["merge_plans"] = measure(
+        lambda: generate_problems.build_merge_plans(ids_map, set(LEAF_PARTS)), repeat
+    )
+
+    def difficulty():
+        return [generate_problems.calculate_difficulty(list(w), atomic_costs) for w in words]
+    _, results["calculate_difficulty"] = measure(difficulty, repeat)
+
+    def process():
+        jukugo_list = []
+        generate_problems.process_file(src_path, atomic_costs, merge_plans, jukugo_list, set())
+        return jukugo_list
+    jukugo_list, results["process_file"] = measure(quiet(process), repeat)
+
+    atom_parts, results["atom_parts"] = measure(
+        lambda: generate_problems.build_atom_parts(jukugo_list, merge_plans), repeat
+    )
+    generate_problems.attach_atoms(jukugo_list, atom_parts)
+
+    _, results["corpus_stats"] = measure(lambda: analyze(jukugo_list, atomic_costs), repeat)
+
+    return results
+
+def run_benchmarks(ids_sizes, jukugo_sizes, repeat):
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="kanji-bench-") as workdir:
+        chars, ids_map = None, None
+        for size in ids_sizes:
+            print(f"⏱️ IDS {size:,} 行...")
+            chars, ids_map, stage_results = bench_ids(workdir, size, repeat)
+            for stage, r in stage_results.items():
+                results[f"ids{size}/{stage}"] = r
+
+        # 熟語側は最大の合成IDSを辞書として使う
+        for size in jukugo_sizes:
+            print(f"⏱️ 熟語 {size:,} 行...")
+            stage_results = bench_jukugo(workdir, size, chars, ids_map, repeat)
+            for stage, r in stage_results.items():
+                results[f"jukugo{size}/{stage}"] = r
+
+    return results
+
+# ==========================================
+# ベースライン比較
+# ==========================================
+def compare(results, baseline, threshold):
+    """ベースラインより threshold 以上遅くなった（またはメモリが増えた）項目を返す"""
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base: continue
+        for metric in ("seconds", "peak_kb"):
+            delta = r[metric] - base[metric]
+            if delta > MIN_DELTA[metric] and delta > base[metric] * threshold:
+                regressions.append((name, metric, base[metric], r[metric]))
+    return regressions
+
+def print_results(results, baseline):
+    print("-" * 72)
+    print(f"{'項目':<38}{'時間(ms)':>12}{'ピーク(KB)':>12}{'前回比':>10}")
+    print("-" * 72)
+    for name, r in results.items():
+        base = baseline.get(name)
+        ratio = f"{r['seconds'] / base['seconds']:.2f}x" if base and base["seconds"] else "-"
+        print(f"{name:<38}{r['seconds'] * 1000:>12.1f}{r['peak_kb']:>12.0f}{ratio:>10}")
+    print("-" * 72)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="合成コーパスでツール各段階の速度・メモリを計測する")
+    parser.add_argument("--ids-sizes", type=int, nargs="+", default=DEFAULT_IDS_SIZES)
+    parser.add_argument("--jukugo-sizes", type=int, nargs="+", default=DEFAULT_JUKUGO_SIZES)
+    parser.add_argument("--quick", action="store_true", help="最小サイズだけで計測する")
+    parser.add_argument("--repeat", type=int, default=3, help="各計測の試行回数（最速値を採用）")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="比較するベースラインファイル")
+    parser.add_argument("--save-baseline", action="store_true", help="今回の結果をベースラインとして保存する")
+    parser.add_argument("--threshold", type=float, default=0.2, help="劣化とみなす割合（0.2 = 20%%）")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    ids_sizes = args.ids_sizes[:1] if args.quick else args.ids_sizes
+    jukugo_sizes = args.jukugo_sizes[:1] if args.quick else args.jukugo_sizes
+
+    print("🏁 ベンチマークを開始します...")
+    results = run_benchmarks(ids_sizes, jukugo_sizes, args.repeat)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f).get("results", {})
+
+    print_results(results, baseline)
+    max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"📈 プロセス最大RSS: {max_rss_mb:.0f}MB")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"💾 ベースラインを保存しました: {args.baseline}")
+        return
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"⚠️ {args.threshold:.0%} 以上の劣化が {len(regressions)} 件あります！")
+        for name, metric, before, after in regressions:
+            print(f"   {name} [{metric}]: {before} -> {after}")
+        sys.exit(1)
+    elif baseline:
+        print("✅ ベースラインからの劣化はありません。")
+
+if __name__ == "__main__":
+    main()
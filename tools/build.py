@@ -0,0 +1,291 @@
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# ==========================================
+# 設定
+# ==========================================
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.normpath(os.path.join(CURRENT_DIR, "../src/features/kanji-core/data"))
+CACHE_DIR = os.path.join(CURRENT_DIR, ".cache")
+STATE_FILE = os.path.join(CACHE_DIR, "pipeline-state.json")
+REPORT_DIR = os.path.join(CACHE_DIR, "reports")
+
+def tool(name):
+    return os.path.join(CURRENT_DIR, name)
+
+def data(name):
+    return os.path.join(DATA_DIR, name)
+
+def report(name):
+    return os.path.join(REPORT_DIR, f"{name}.json")
+
+SOURCE_FILES = [tool("jukugo_source.txt"), tool("jukugo_source_extra.txt")]
+VALIDATOR_CODE = [tool("recipe_graph.py"), tool("source_reader.py")]
+GENERATOR_TS = os.path.normpath(os.path.join(CURRENT_DIR, "../src/features/kanji-core/logic/generator.ts"))
+
+class Stage:
+    """パイプラインの1段階（入力ファイルが変わったときだけスクリプトを実行する）"""
+    def __init__(self, name, script, inputs, outputs, args=(), show_output=False):
+        self.name = name
+        self.script = tool(script)
+        # スクリプト自身も入力に含める（ロジックを変えたら作り直す）
+        self.inputs = [self.script] + inputs
+        self.outputs = outputs
+        self.args = list(args)
+        # -v なしでも出力を表示する（サイズ予算の報告など）
+        self.show_output = show_output
+
+# 入力 -> 出力 の依存関係（ids.txt など -> ids-map -> 問題DB / レポート）
+STAGES = [
+    Stage(
+        "dictionary", "generate_dictionary.py",
+        inputs=[tool("ids_index.py"), tool("compact_format.py"), tool("metrics.py"),
+                tool("ids.txt"), tool("joyo.txt"), tool("dictionary_config.json")],
+        outputs=[data("ids-map-auto.json"), data("merge-index-auto.json")],
+    ),
+    Stage(
+        "problems", "generate_problems.py",
+        inputs=[tool("compact_format.py"), tool("recipe_graph.py"), tool("source_reader.py"), data("ids-map-auto.json"),
+                tool("dictionary_config.json")] + SOURCE_FILES,
+        outputs=[data("jukugo-db-auto.json"), data("atomic-cost-auto.json"), data("atom-parts-auto.json"),
+                 data("shards/manifest.json")]
+                + [data(f"shards/jukugo-{name}.json") for name in ("d1-3", "d4-5", "d6-10")],
+        args=["--incremental"],
+    ),
+    Stage(
+        "distractors", "generate_distractors.py",
+        inputs=[tool("validate_stages.py"), tool("generate_dictionary.py"), tool("dictionary_config.json"),
+                data("jukugo-db-auto.json"), data("atom-parts-auto.json"), data("merge-index-auto.json"), GENERATOR_TS],
+        outputs=[data("distractor-pool-auto.json")],
+    ),
+    Stage(
+        "indexes", "generate_indexes.py",
+        inputs=[tool("recipe_graph.py"), data("ids-map-auto.json"), data("jukugo-db-auto.json")],
+        outputs=[data("inverted-index-auto.json"), os.path.join(CACHE_DIR, "tooling-index.json")],
+        show_output=True,
+    ),
+    Stage(
+        "stats", "analyze_corpus.py",
+        inputs=[tool("generate_problems.py"), data("jukugo-db-auto.json"), data("atomic-cost-auto.json"),
+                data("atom-parts-auto.json")],
+        outputs=[report("corpus_stats")],
+        # numpy が入っている環境では、標準ライブラリ版と結果が一致するかも確かめる
+        args=["--json", report("corpus_stats"), "--check-backends"],
+    ),
+    Stage(
+        "check:multi_part", "validate_all.py",
+        inputs=VALIDATOR_CODE + [data("ids-map-auto.json")],
+        outputs=[report("multi_part")],
+        args=["--check", "multi_part", "--json", report("multi_part")],
+    ),
+    Stage(
+        "check:definitions", "validate_all.py",
+        inputs=VALIDATOR_CODE + [data("ids-map-auto.json"), tool("dictionary_config.json")] + SOURCE_FILES,
+        outputs=[report("definitions")],
+        args=["--check", "definitions", "--json", report("definitions")],
+    ),
+    Stage(
+        "check:reachability", "validate_all.py",
+        inputs=VALIDATOR_CODE + [data("ids-map-auto.json"), tool("dictionary_config.json")] + SOURCE_FILES,
+        outputs=[report("reachability")],
+        args=["--check", "reachability", "--json", report("reachability")],
+    ),
+    Stage(
+        "check:stages", "validate_stages.py",
+        inputs=[tool("generate_dictionary.py"), tool("generate_problems.py"), data("jukugo-db-auto.json"),
+                data("atom-parts-auto.json"), data("merge-index-auto.json"), data("distractor-pool-auto.json"),
+                GENERATOR_TS],
+        outputs=[report("stages")],
+        args=["--json", report("stages")],
+    ),
+]
+
+# ==========================================
+# 状態管理（内容ハッシュ）
+# ==========================================
+class FileHasher:
+    """サイズと mtime が前回と同じならハッシュを再計算しない"""
+    def __init__(self, known):
+        self.known = known
+        self.cache = {}
+
+    def digest(self, path):
+        if path in self.cache:
+            return self.cache[path]
+        if not os.path.exists(path):
+            return None
+
+        st = os.stat(path)
+        known = self.known.get(path)
+        if known and known["size"] == st.st_size and known["mtime_ns"] == st.st_mtime_ns:
+            digest = known["sha256"]
+        else:
+            h = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+            digest = h.hexdigest()
+            self.known[path] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+
+        self.cache[path] = digest
+        return digest
+
+    def forget(self, paths):
+        for path in paths:
+            self.cache.pop(path, None)
+
+def load_state():
+    if not os.path.exists(STATE_FILE):
+        return {"files": {}, "stages": {}}
+    with open(STATE_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def save_state(state):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+
+def snapshot(paths, hasher):
+    return {os.path.relpath(p, CURRENT_DIR): hasher.digest(p) for p in paths}
+
+def is_stale(stage, state, hasher):
+    recorded = state["stages"].get(stage.name)
+    if recorded is None:
+        return True
+    if any(not os.path.exists(p) for p in stage.outputs):
+        return True
+    return (recorded["inputs"] != snapshot(stage.inputs, hasher)
+            or recorded["outputs"] != snapshot(stage.outputs, hasher))
+
+def stage_levels(stages):
+    """依存関係で段階分けする（同じ段の中は互いに独立なので並列実行できる）"""
+    producers = {out: s.name for s in stages for out in s.outputs}
+    depth = {}
+    for s in stages:
+        deps = [producers[p] for p in s.inputs if p in producers and producers[p] != s.name]
+        depth[s.name] = 1 + max((depth[d] for d in deps), default=-1)
+
+    levels = []
+    for s in stages:
+        while len(levels) <= depth[s.name]:
+            levels.append([])
+        levels[depth[s.name]].append(s)
+    return levels
+
+# ==========================================
+# 実行
+# ==========================================
+def run_stage(stage):
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, stage.script] + stage.args,
+        cwd=CURRENT_DIR, capture_output=True, text=True, encoding="utf-8"
+    )
+    return proc, (time.perf_counter() - start) * 1000
+
+def read_check_result(stage):
+    """検証ステージのレポートから問題件数を取り出す"""
+    path = stage.outputs[0]
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        checks = json.load(f).get("checks", {})
+    return sum(c["count"] for c in checks.values())
+
+def run_pipeline(force=False, verbose=False):
+    """古くなったステージだけを依存順に実行する。戻り値: すべて成功したか"""
+    start = time.perf_counter()
+    state = load_state()
+    hasher = FileHasher(state["files"])
+    ok = True
+
+    for level in stage_levels(STAGES):
+        stale = [s for s in level if force or is_stale(s, state, hasher)]
+        for s in level:
+            if s not in stale:
+                print(f"⏭️  {s.name}: 変更なし（スキップ）")
+        if not stale:
+            continue
+
+        with ThreadPoolExecutor(max_workers=len(stale)) as executor:
+            results = list(executor.map(run_stage, stale))
+
+        for s, (proc, elapsed_ms) in zip(stale, results):
+            if proc.returncode != 0:
+                ok = False
+                print(f"❌ {s.name}: 失敗しました（{elapsed_ms:.0f}ms）")
+                print(proc.stdout + proc.stderr)
+                state["stages"].pop(s.name, None)
+                continue
+
+            if verbose or s.show_output:
+                print(proc.stdout, end="")
+            issues = read_check_result(s) if s.name.startswith("check:") else None
+            suffix = f" / 指摘 {issues} 件" if issues else ""
+            print(f"✅ {s.name}: 完了（{elapsed_ms:.0f}ms{suffix}）")
+
+            # 出力は書き換わったので測り直す
+            hasher.forget(s.outputs)
+            state["stages"][s.name] = {
+                "inputs": snapshot(s.inputs, hasher),
+                "outputs": snapshot(s.outputs, hasher),
+            }
+
+        if not ok:
+            print("🛑 失敗したステージがあるため、以降のステージは実行しません。")
+            break
+
+    save_state(state)
+    print(f"⏱️ 合計 {(time.perf_counter() - start) * 1000:.0f}ms")
+    return ok
+
+def watched_files():
+    return sorted({p for s in STAGES for p in s.inputs if p not in {o for t in STAGES for o in t.outputs}})
+
+def mtimes(paths):
+    return {p: os.stat(p).st_mtime_ns if os.path.exists(p) else None for p in paths}
+
+def watch(interval, verbose=False):
+    """入力ファイルを監視し、変更があれば影響するステージだけ作り直す"""
+    paths = watched_files()
+    print(f"👀 {len(paths)} 個のファイルを監視中...（Ctrl+C で終了）")
+    run_pipeline(verbose=verbose)
+    last = mtimes(paths)
+    try:
+        while True:
+            time.sleep(interval)
+            current = mtimes(paths)
+            changed = [p for p in paths if current[p] != last[p]]
+            if not changed:
+                continue
+            last = current
+            print("-" * 60)
+            print(f"✏️ 変更を検出: {', '.join(os.path.basename(p) for p in changed)}")
+            run_pipeline(verbose=verbose)
+    except KeyboardInterrupt:
+        print("\n👋 監視を終了しました。")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="辞書 -> 問題DB -> 検証 のビルドパイプライン")
+    parser.add_argument("--force", action="store_true", help="変更の有無に関係なく全ステージを実行する")
+    parser.add_argument("--watch", action="store_true", help="入力ファイルを監視して自動で再ビルドする")
+    parser.add_argument("--interval", type=float, default=0.5, help="監視間隔（秒）")
+    parser.add_argument("-v", "--verbose", action="store_true", help="各スクリプトの出力も表示する")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.watch:
+        watch(args.interval, args.verbose)
+    else:
+        ok = run_pipeline(force=args.force, verbose=args.verbose)
+        sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
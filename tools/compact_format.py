@@ -0,0 +1,233 @@
+import json
+import os
+import struct
+import sys
+import time
+from array import array
+
+# ==========================================
+# 設定
+# ==========================================
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(CURRENT_DIR, "../src/features/kanji-core/data")
+IDS_MAP_JSON = os.path.join(DATA_DIR, "ids-map-auto.json")
+IDS_MAP_BIN = os.path.join(DATA_DIR, "ids-map-auto.bin")
+JUKUGO_DB_JSON = os.path.join(DATA_DIR, "jukugo-db-auto.json")
+JUKUGO_DB_BIN = os.path.join(DATA_DIR, "jukugo-db-auto.bin")
+
+# コンパクト形式（すべてリトルエンディアン、各セクションは4バイト境界に揃える）
+#   ヘッダー(32B): マジック, バージョン, 種別, 文字列数, 文字列バイト数, レコード数, パーツ総数, 予約
+#   文字列表    : offsets u32[文字列数 + 1] + UTF-8 本体（同じ文字列は1回だけ格納）
+#   ids-map     : keys u32[n], part_offsets u32[n + 1], parts u32[パーツ総数]   ※値はすべて文字列番号
+#   jukugo-db   : id/kanji/reading/meaning/sentence u32[n] ×5, difficulty u8[n], merges u8[n],
+#                 component_offsets u32[n + 1], components u32[パーツ総数]
+# JS 側でも Uint32Array / Uint8Array をそのまま被せて読める並びにしている
+MAGIC = b"KMCF"
+VERSION = 2
+KIND_IDS_MAP = 1
+KIND_JUKUGO_DB = 2
+HEADER_FORMAT = "<4sIIIIIII"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+JUKUGO_STRING_FIELDS = ["id", "kanji", "reading", "meaning", "sentence"]
+
+class StringTable:
+    """文字列の intern 表（初出順に番号を振る）"""
+    def __init__(self):
+        self.index = {}
+        self.strings = []
+
+    def intern(self, s):
+        if s not in self.index:
+            self.index[s] = len(self.strings)
+            self.strings.append(s)
+        return self.index[s]
+
+def _u32(values):
+    arr = array("I", values)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr.tobytes()
+
+def _pad4(data):
+    return data + b"\0" * (-len(data) % 4)
+
+def _encode(kind, table, record_count, part_count, body):
+    blobs = [s.encode("utf-8") for s in table.strings]
+    offsets = [0]
+    for b in blobs:
+        offsets.append(offsets[-1] + len(b))
+    string_bytes = b"".join(blobs)
+
+    header = struct.pack(
+        HEADER_FORMAT, MAGIC, VERSION, kind,
+        len(blobs), len(string_bytes), record_count, part_count, 0
+    )
+    return header + _u32(offsets) + _pad4(string_bytes) + body
+
+class _Reader:
+    def __init__(self, data, expected_kind):
+        (magic, version, kind, string_count, string_bytes,
+         self.record_count, self.part_count, _) = struct.unpack_from(HEADER_FORMAT, data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("コンパクト形式のファイルではありません")
+        if kind != expected_kind:
+            raise ValueError(f"種別が違います（{kind} != {expected_kind}）")
+
+        self.data = data
+        self.pos = HEADER_SIZE
+        offsets = self.u32(string_count + 1)
+        blob = data[self.pos:self.pos + string_bytes]
+        self.pos += string_bytes + (-string_bytes % 4)
+        self.strings = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(string_count)]
+
+    def u32(self, count):
+        arr = array("I")
+        arr.frombytes(self.data[self.pos:self.pos + count * 4])
+        if sys.byteorder != "little":
+            arr.byteswap()
+        self.pos += count * 4
+        return arr
+
+    def u8(self, count):
+        arr = self.data[self.pos:self.pos + count]
+        self.pos += count + (-count % 4)
+        return arr
+
+def encode_ids_map(dictionary):
+    table = StringTable()
+    keys = []
+    offsets = [0]
+    parts = []
+    for kanji, recipe in dictionary.items():
+        keys.append(table.intern(kanji))
+        parts.extend(table.intern(p) for p in recipe)
+        offsets.append(len(parts))
+
+    body = _u32(keys) + _u32(offsets) + _u32(parts)
+    return _encode(KIND_IDS_MAP, table, len(keys), len(parts), body)
+
+def decode_ids_map(data):
+    r = _Reader(data, KIND_IDS_MAP)
+    keys = r.u32(r.record_count)
+    offsets = r.u32(r.record_count + 1)
+    parts = r.u32(r.part_count)
+    strings = r.strings
+    return {
+        strings[k]: [strings[p] for p in parts[offsets[i]:offsets[i + 1]]]
+        for i, k in enumerate(keys)
+    }
+
+def encode_jukugo_db(jukugo_list):
+    table = StringTable()
+    columns = {field: [] for field in JUKUGO_STRING_FIELDS}
+    difficulty = bytearray()
+    merges = bytearray()
+    offsets = [0]
+    components = []
+    for entry in jukugo_list:
+        for field in JUKUGO_STRING_FIELDS:
+            columns[field].append(table.intern(entry.get(field, "")))
+        difficulty.append(entry["difficulty"])
+        merges.append(entry["merges"])
+        components.extend(table.intern(c) for c in entry["components"])
+        offsets.append(len(components))
+
+    body = b"".join(_u32(columns[field]) for field in JUKUGO_STRING_FIELDS)
+    body += _pad4(bytes(difficulty)) + _pad4(bytes(merges)) + _u32(offsets) + _u32(components)
+    return _encode(KIND_JUKUGO_DB, table, len(jukugo_list), len(components), body)
+
+def decode_jukugo_db(data):
+    r = _Reader(data, KIND_JUKUGO_DB)
+    n = r.record_count
+    columns = {field: r.u32(n) for field in JUKUGO_STRING_FIELDS}
+    difficulty = r.u8(n)
+    merges = r.u8(n)
+    offsets = r.u32(n + 1)
+    components = r.u32(r.part_count)
+    strings = r.strings
+
+    # JSON版と同じキー順で復元する
+    return [
+        {
+            "id": strings[columns["id"][i]],
+            "kanji": strings[columns["kanji"][i]],
+            "reading": strings[columns["reading"][i]],
+            "meaning": strings[columns["meaning"][i]],
+            "difficulty": difficulty[i],
+            "merges": merges[i],
+            "components": [strings[c] for c in components[offsets[i]:offsets[i + 1]]],
+            "sentence": strings[columns["sentence"][i]],
+        }
+        for i in range(n)
+    ]
+
+def verify_round_trip(obj, encode, decode):
+    """書き出し -> 読み込みで元のデータと完全に一致するか"""
+    return decode(encode(obj)) == obj
+
+def write_compact(obj, encode, decode, output_path):
+    """コンパクト形式で書き出し、往復検証してからファイルに保存する"""
+    data = encode(obj)
+    if decode(data) != obj:
+        raise ValueError(f"往復検証に失敗しました: {os.path.basename(output_path)}")
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "wb") as f:
+        f.write(data)
+    return data
+
+def _best_ms(func, arg, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(arg)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+def compare_formats(obj, encode, decode, label):
+    """JSON（indent=2）とコンパクト形式のサイズ・パース時間を比べて表示する"""
+    json_bytes = json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    compact_bytes = encode(obj)
+
+    json_ms = _best_ms(lambda b: json.loads(b.decode("utf-8")), json_bytes)
+    compact_ms = _best_ms(decode, compact_bytes)
+    ratio = len(compact_bytes) / len(json_bytes) * 100 if json_bytes else 0.0
+
+    print(f"📐 {label}: JSON {len(json_bytes) / 1024:.1f}KB / {json_ms:.2f}ms"
+          f"  ->  コンパクト {len(compact_bytes) / 1024:.1f}KB / {compact_ms:.2f}ms（サイズ {ratio:.0f}%）")
+
+def main():
+    """既存の JSON 成果物を使って、往復検証とサイズ・パース時間の比較を行う"""
+    print("🔍 コンパクト形式の検証...")
+    targets = [
+        ("ids-map", IDS_MAP_JSON, IDS_MAP_BIN, encode_ids_map, decode_ids_map),
+        ("jukugo-db", JUKUGO_DB_JSON, JUKUGO_DB_BIN, encode_jukugo_db, decode_jukugo_db),
+    ]
+    ok = True
+    for label, json_path, bin_path, encode, decode in targets:
+        if not os.path.exists(json_path):
+            print(f"⚠️ ファイルが見つかりません（スキップします）: {os.path.basename(json_path)}")
+            continue
+        with open(json_path, "r", encoding="utf-8") as f:
+            obj = json.load(f)
+
+        if not verify_round_trip(obj, encode, decode):
+            print(f"❌ {label}: 往復検証に失敗しました")
+            ok = False
+            continue
+
+        # 書き出し済みの .bin があれば、それが今の JSON と一致するかも確認
+        if os.path.exists(bin_path):
+            with open(bin_path, "rb") as f:
+                if decode(f.read()) != obj:
+                    print(f"❌ {label}: {os.path.basename(bin_path)} が JSON と一致しません（再生成してください）")
+                    ok = False
+
+        compare_formats(obj, encode, decode, label)
+
+    if not ok:
+        sys.exit(1)
+    print("✅ 往復検証OK: コンパクト形式は JSON と同じ内容を表しています。")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+import argparse
+import json
+import os
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from generate_dictionary import (
+    CONFIG_FILE, INPUT_IDS_FILE, INPUT_JOYO_FILE, OUTPUT_JSON_FILE, DecompositionEngine,
+    build_merge_index, load_config, load_joyo_kanji, merge_key,
+)
+from generate_problems import build_atomic_cost_table, build_merge_plans, calculate_difficulty, jukugo_merge_plan
+from ids_graph import load_ids_graph
+from validate_all import can_make, compute_reachability
+
+# ==========================================
+# 設定
+# ==========================================
+# localhost からだけ受け付ける
+HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# 監視するファイル
+WATCHED_FILES = {
+    "ids": INPUT_IDS_FILE,
+    "config": CONFIG_FILE,
+    "joyo": INPUT_JOYO_FILE,
+    "ids_map": OUTPUT_JSON_FILE,
+}
+
+# 派生データ -> 依存するファイル（そのファイルが変わったときだけ作り直す）
+DERIVED_DEPENDS = {
+    "engine": ("ids", "config", "joyo"),
+    "merge_index": ("ids_map",),
+    "atomic_costs": ("ids_map",),
+    "merge_plans": ("ids_map", "config"),
+    "reachability": ("ids_map", "config"),
+}
+
+def file_mtime(filepath):
+    try:
+        return os.stat(filepath).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+class DictionaryState:
+    """
+    IDSグラフ・設定・ids-map をメモリに載せたままにする
+    問い合わせのたびにファイルの mtime だけを見て、変わったファイルとそれに依存する表だけを読み直す
+    派生データ（分解エンジン・ペア索引など）は最初に使われたときに作る
+    """
+    def __init__(self):
+        self.mtimes = {}
+        self.loaded = {}
+        self.derived = {}
+        self.reloads = {name: 0 for name in WATCHED_FILES}
+
+    def refresh(self):
+        """変わったファイルだけ読み直す。戻り値: 読み直したファイル名のリスト"""
+        changed = []
+        for name, filepath in WATCHED_FILES.items():
+            mtime = file_mtime(filepath)
+            if name in self.mtimes and self.mtimes[name] == mtime:
+                continue
+            start = time.perf_counter()
+            self.loaded[name] = self._load(name)
+            self.mtimes[name] = mtime
+            self.reloads[name] += 1
+            for key, depends in DERIVED_DEPENDS.items():
+                if name in depends:
+                    self.derived.pop(key, None)
+            changed.append(name)
+            print(f"🔄 読込: {os.path.basename(filepath)}（{(time.perf_counter() - start) * 1000:.1f}ms）")
+        # 原子パーツが変わると常用漢字の許可リストも変わる
+        if "config" in changed and "joyo" not in changed:
+            self.loaded["joyo"] = self._load("joyo")
+        return changed
+
+    def _load(self, name):
+        if name == "ids":
+            graph, _ = load_ids_graph(INPUT_IDS_FILE)
+            return graph
+        if name == "config":
+            return load_config()
+        if name == "joyo":
+            return load_joyo_kanji(self.atomic_parts)
+        if os.path.exists(OUTPUT_JSON_FILE):
+            with open(OUTPUT_JSON_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+    @property
+    def atomic_parts(self):
+        return self.loaded["config"][0]
+
+    @property
+    def manual_overrides(self):
+        return self.loaded["config"][1]
+
+    @property
+    def ids_map(self):
+        return self.loaded["ids_map"]
+
+    def get(self, key):
+        if key not in self.derived:
+            self.derived[key] = self._build(key)
+        return self.derived[key]
+
+    def _build(self, key):
+        if key == "engine":
+            return DecompositionEngine(self.loaded["ids"], self.loaded["joyo"], self.atomic_parts)
+        if key == "merge_index":
+            return build_merge_index(self.ids_map)[0]
+        if key == "atomic_costs":
+            return build_atomic_cost_table(self.ids_map)[0]
+        if key == "merge_plans":
+            return build_merge_plans(self.ids_map, self.atomic_parts)
+        return compute_reachability(self.ids_map, self.atomic_parts)
+
+    # ==========================================
+    # パラメータの検査（問題があればエラーメッセージを返す）
+    # ==========================================
+    def check_char(self, value):
+        """1文字だけを受け付ける"""
+        if len(value) == 1:
+            return None
+        return f"1文字を指定してください: {value}"
+
+    def check_part(self, value):
+        """1文字、または ids-map にある中間パーツ名（&...）を受け付ける（合体・作成可否用）"""
+        if value.startswith("&") and value in self.ids_map:
+            return None
+        return self.check_char(value)
+
+    def check_jukugo(self, value):
+        """辞書（ids-map か原子パーツ）にある文字だけでできた熟語を受け付ける"""
+        unknown = [c for c in value if c not in self.ids_map and c not in self.atomic_parts]
+        if unknown:
+            return f"辞書にない文字を含んでいます: {''.join(unknown)}"
+        return None
+
+    # ==========================================
+    # 問い合わせ
+    # ==========================================
+    def decompose(self, char):
+        """generate_dictionary.py と同じ分解（手動設定が優先）と、現在の ids-map のレシピ"""
+        if char in self.manual_overrides:
+            decomposition = self.manual_overrides[char]
+        else:
+            decomposition = self.get("engine").decompose(char)
+        return {
+            "char": char,
+            "atomic": char in self.atomic_parts,
+            "override": char in self.manual_overrides,
+            "decomposition": decomposition,
+            "recipe": self.ids_map.get(char),
+        }
+
+    def parents(self, char):
+        """ids.txt 上で char を構成要素に持つ文字（逆引き）"""
+        return {"char": char, "parents": self.loaded["ids"].parents(char)}
+
+    def merge(self, a, b):
+        key = merge_key(a, b)
+        return {"pair": key, "result": self.get("merge_index").get(key)}
+
+    def reachability(self, char):
+        ok, reason = can_make(char, self.get("reachability"), self.atomic_parts, self.ids_map)
+        return {"char": char, "ok": ok, "reason": reason}
+
+    def difficulty(self, jukugo):
+        kanji_list = list(jukugo)
+        atoms, plan = jukugo_merge_plan(kanji_list, self.get("merge_plans"))
+        return {
+            "jukugo": jukugo,
+            "difficulty": calculate_difficulty(kanji_list, self.get("atomic_costs")),
+            "atoms": atoms,
+            "plan": plan,
+        }
+
+    def status(self):
+        return {
+            "files": {
+                name: {"path": WATCHED_FILES[name], "mtime_ns": self.mtimes.get(name), "reloads": self.reloads[name]}
+                for name in WATCHED_FILES
+            },
+            "derived": sorted(self.derived),
+        }
+
+# 問い合わせ名 -> (必須パラメータ, 処理)
+QUERIES = {
+    "decompose": (("char",), lambda state, q: state.decompose(q["char"])),
+    "parents": (("char",), lambda state, q: state.parents(q["char"])),
+    "merge": (("a", "b"), lambda state, q: state.merge(q["a"], q["b"])),
+    "reachability": (("char",), lambda state, q: state.reachability(q["char"])),
+    "difficulty": (("jukugo",), lambda state, q: state.difficulty(q["jukugo"])),
+    "status": ((), lambda state, q: state.status()),
+}
+
+# 問い合わせ名 -> パラメータごとの値の検査
+PARAM_CHECKS = {
+    "decompose": {"char": DictionaryState.check_char},
+    "parents": {"char": DictionaryState.check_char},
+    "merge": {"a": DictionaryState.check_part, "b": DictionaryState.check_part},
+    "reachability": {"char": DictionaryState.check_part},
+    "difficulty": {"jukugo": DictionaryState.check_jukugo},
+}
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """GET /<問い合わせ名>?パラメータ に JSON で答える"""
+    state = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        name = url.path.strip("/")
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+
+        if name not in QUERIES:
+            self.reply(404, {"error": f"不明な問い合わせです: {name}", "queries": sorted(QUERIES)})
+            return
+        required, handler = QUERIES[name]
+        missing = [p for p in required if not query.get(p)]
+        if missing:
+            self.reply(400, {"error": f"パラメータが足りません: {', '.join(missing)}"})
+            return
+
+        start = time.perf_counter()
+        try:
+            reloaded = self.state.refresh()
+            checks = PARAM_CHECKS.get(name, {})
+            errors = [e for e in (check(self.state, query[p]) for p, check in checks.items()) if e]
+            if errors:
+                self.reply(400, {"error": " / ".join(errors)})
+                return
+            result = handler(self.state, query)
+        except Exception as e:
+            # 1件の失敗で常駐プロセスを止めず、内容を返して次の問い合わせを待つ
+            traceback.print_exc()
+            self.reply(500, {"error": f"問い合わせの処理に失敗しました: {type(e).__name__}: {e}"})
+            return
+        result["reloaded"] = reloaded
+        result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        self.reply(200, result)
+
+    def reply(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass # 1問い合わせごとのアクセスログは出さない
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="辞書データをメモリに載せたまま問い合わせに答える常駐プロセス")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"待ち受けるポート（既定: {DEFAULT_PORT}）")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    state = DictionaryState()
+    state.refresh()
+    QueryHandler.state = state
+
+    server = HTTPServer((HOST, args.port), QueryHandler)
+    print(f"🛰 待ち受け中: http://{HOST}:{args.port}/（{', '.join(sorted(QUERIES))}）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 終了します")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
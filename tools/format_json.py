@@ -39,24 +39,13 @@ def format_overrides_compact(overrides, indent=4):
         
     return "{\n" + ",\n".join(lines) + "\n  }"
 
-def main():
-    if not os.path.exists(CONFIG_FILE):
-        print(f"❌ ファイルが見つかりません: {CONFIG_FILE}")
-        return
-
-    print("🧹 JSONを見やすく整形中（レシピを横並びに変換）...")
-
-    with open(CONFIG_FILE, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    atomic_parts = data.get("atomic_parts", [])
-    manual_overrides = data.get("manual_overrides", {})
-
+def write_config(data):
+    """設定JSONを atomic_parts は折り返し、manual_overrides は1レシピ1行で書き出す"""
     # 1. atomic_parts の整形（1行12個くらいで折り返し）
-    formatted_atomic = format_list_compact(atomic_parts, items_per_line=12, indent=4)
+    formatted_atomic = format_list_compact(data.get("atomic_parts", []), items_per_line=12, indent=4)
 
     # 2. manual_overrides の整形（値のリストを横一列にする！）
-    formatted_overrides = format_overrides_compact(manual_overrides, indent=4)
+    formatted_overrides = format_overrides_compact(data.get("manual_overrides", {}), indent=4)
 
     # 3. 全体を結合
     final_json = f"""{{
@@ -67,6 +56,18 @@ def main():
     with open(CONFIG_FILE, "w", encoding="utf-8") as f:
         f.write(final_json)
 
+def main():
+    if not os.path.exists(CONFIG_FILE):
+        print(f"❌ ファイルが見つかりません: {CONFIG_FILE}")
+        return
+
+    print("🧹 JSONを見やすく整形中（レシピを横並びに変換）...")
+
+    with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    write_config(data)
+
     print("✨ 整形完了！ すべてのレシピが横一列で見やすくなりました。")
 
 if __name__ == "__main__":
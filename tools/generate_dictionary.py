@@ -1,5 +1,13 @@
+import argparse
 import json
 import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from compact_format import IDS_MAP_BIN, compare_formats, decode_ids_map, encode_ids_map, write_compact
+from ids_index import INDEX_FILE, IdsIndex, format_stats, load_ids_db
+from metrics import Metrics
 
 # ==========================================
 # 設定
@@ -9,6 +17,16 @@ INPUT_IDS_FILE = os.path.join(CURRENT_DIR, "ids.txt")
 INPUT_JOYO_FILE = os.path.join(CURRENT_DIR, "joyo.txt")
 CONFIG_FILE = os.path.join(CURRENT_DIR, "dictionary_config.json") # ★設定ファイルのパス
 OUTPUT_JSON_FILE = os.path.join(CURRENT_DIR, "../src/features/kanji-core/data/ids-map-auto.json")
+# 合体判定用の索引（順不同のパーツペア -> 合体結果）
+OUTPUT_MERGE_INDEX_FILE = os.path.join(CURRENT_DIR, "../src/features/kanji-core/data/merge-index-auto.json")
+
+# --all-cjk で対象にする CJK統合漢字の範囲（URO + 拡張A〜H）
+CJK_UNIFIED_RANGES = [
+    (0x4E00, 0x9FFF),
+    (0x3400, 0x4DBF),
+    (0x20000, 0x2EBEF),
+    (0x30000, 0x323AF),
+]
 
 def load_config():
     """設定JSONを読み込む"""
@@ -45,112 +63,593 @@ def load_joyo_kanji(atomic_parts):
     
     return allowed_set
 
-def parse_ids_file(filepath):
-    """IDSファイルを全読み込み"""
-    ids_db = {}
-    try:
-        with open(filepath, "r", encoding="utf-8") as f:
-            for line in f:
-                if line.startswith(";;"): continue
-                parts = line.strip().split("\t")
-                if len(parts) < 3: continue
-                
-                kanji = parts[1]
-                structure = parts[2]
-                components = [c for c in structure if c not in "⿰⿱⿲⿳⿴⿵⿶⿷⿸⿹⿺⿻" and c != kanji]
-                ids_db[kanji] = components
-    except FileNotFoundError:
-        print("❌ ids.txt がありません")
-        return {}
-    return ids_db
+def add_cjk_unified(allowed_set, ids_db):
+    """IDS定義のある CJK統合漢字をすべて許可リストに追加する"""
+    for char in ids_db:
+        cp = ord(char)
+        if any(lo <= cp <= hi for lo, hi in CJK_UNIFIED_RANGES):
+            allowed_set.add(char)
 
-def deep_decompose(kanji, ids_db, allowed_set, atomic_parts, depth=0):
-    """再帰的に分解して、知っている文字(allowed_set)だけで構成されたリストを返す"""
-    if depth > 5: return None # 深すぎたら諦める
+class DecompositionEngine:
+    """
+    IDSグラフ全体を対象にした分解エンジン
+    構成要素（依存先）から順に1文字1回だけ分解してメモし、
+    循環参照は深さ制限ではなく強連結成分として明示的に検出する
+    """
+    def __init__(self, ids_db, allowed_set, atomic_parts, collect_stats=False):
+        self.ids_db = ids_db
+        self.allowed_set = allowed_set
+        self.atomic_parts = atomic_parts
+        self.memo = {}
+        self.cycles = []
+        self._components = {}
+        # --metrics 指定時のみ: 文字ごとの分解の深さと、分解できなかった理由
+        # （どちらも文字ごとに1つに決まるので、並列数によらず同じ値になる）
+        self.collect_stats = collect_stats
+        self.depth = {}
+        self.rejects = {}
 
-    # 原子パーツ or 定義なし -> そのまま
-    if kanji in atomic_parts or kanji not in ids_db:
-        return [kanji]
+    def components(self, char):
+        if char not in self._components:
+            self._components[char] = self.ids_db[char]
+        return self._components[char]
 
-    components = ids_db[kanji]
-    refined_components = []
-    
-    for comp in components:
-        # 原子パーツに含まれているなら、それ以上分解せずに採用
-        if comp in atomic_parts:
-            refined_components.append(comp)
-        elif comp in allowed_set:
-             # 知ってる文字だけど原子パーツではない場合、さらに分解トライ
-             # （もし分解できなければそのまま使う）
-            sub_comps = deep_decompose(comp, ids_db, allowed_set, atomic_parts, depth + 1)
-            if sub_comps:
-                refined_components.extend(sub_comps)
-            else:
+    def is_leaf(self, char):
+        # 原子パーツ or 定義なし -> そのまま
+        return char in self.atomic_parts or char not in self.ids_db
+
+    def children(self, char):
+        """分解が必要な構成要素（＝この文字より先に計算しておくべき文字）"""
+        if self.is_leaf(char):
+            return []
+        return [c for c in self.components(char) if not self.is_leaf(c)]
+
+    def decompose(self, kanji):
+        """知っている文字(allowed_set)だけで構成されたリストを返す（分解不能なら None）"""
+        if self.is_leaf(kanji):
+            return [kanji]
+        if kanji not in self.memo:
+            self._resolve(kanji)
+        return self.memo[kanji]
+
+    def decompose_all(self, targets):
+        return {kanji: self.decompose(kanji) for kanji in targets}
+
+    def _resolve(self, root):
+        """Tarjan法（非再帰）で依存先から順に強連結成分を確定させていく"""
+        index = {root: 0}
+        low = {root: 0}
+        counter = 1
+        stack = [root]
+        on_stack = {root}
+        work = [(root, iter(self.children(root)))]
+
+        while work:
+            node, it = work[-1]
+            descended = False
+            for child in it:
+                if child in self.memo:
+                    continue
+                if child not in index:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(self.children(child))))
+                    descended = True
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            if descended:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+
+            if low[node] == index[node]:
+                scc = []
+                while True:
+                    w = stack.pop()
+                    on_stack.discard(w)
+                    scc.append(w)
+                    if w == node: break
+                self._finish(scc)
+
+    def _finish(self, scc):
+        blocked = set()
+        if len(scc) > 1:
+            # 循環している文字同士は互いに分解不能として扱う（入口の順番に依存しない）
+            blocked = set(scc)
+            self.cycles.append(self._cycle_path(min(scc), blocked))
+        for char in scc:
+            self.memo[char] = self._refine(char, blocked)
+
+    def _cycle_path(self, start, members):
+        """強連結成分の中から start に戻ってくる循環を1つ取り出す"""
+        prev = {}
+        queue = [start]
+        for node in queue:
+            for child in self.children(node):
+                if child not in members: continue
+                if child == start:
+                    path = [node]
+                    while path[-1] != start:
+                        path.append(prev[path[-1]])
+                    return path[::-1] + [start]
+                if child not in prev:
+                    prev[child] = node
+                    queue.append(child)
+        return [start]
+
+    def _refine(self, kanji, blocked):
+        depth = 1
+
+        refined_components = []
+
+        for comp in self.components(kanji):
+            # 原子パーツに含まれているなら、それ以上分解せずに採用
+            if comp in self.atomic_parts:
                 refined_components.append(comp)
-        else:
-            # 知らない文字なら、さらに分解必須
-            sub_comps = deep_decompose(comp, ids_db, allowed_set, atomic_parts, depth + 1)
-            if sub_comps:
-                refined_components.extend(sub_comps)
+                continue
+
+            if comp in blocked:
+                sub_comps = None
+            elif self.is_leaf(comp):
+                sub_comps = [comp]
+            else:
+                sub_comps = self.memo[comp]
+                if self.collect_stats and sub_comps:
+                    depth = max(depth, self.depth[comp] + 1)
+
+            if comp in self.allowed_set:
+                # 知ってる文字だけど原子パーツではない場合は分解結果を使う
+                # （もし分解できなければそのまま使う）
+                if sub_comps:
+                    refined_components.extend(sub_comps)
+                else:
+                    refined_components.append(comp)
             else:
-                return None # 分解不能
+                # 知らない文字なら、さらに分解必須
+                if sub_comps:
+                    refined_components.extend(sub_comps)
+                else:
+                    if self.collect_stats:
+                        self.rejects[kanji] = "reject_cycle" if comp in blocked else "reject_unknown_component"
+                    return None # 分解不能
+
+        # パーツ数が多すぎる(5個以上)はゲーム的に厳しいのでNG
+        if len(refined_components) > 4:
+            if self.collect_stats:
+                self.rejects[kanji] = "reject_too_many_parts"
+            return None
+
+        if self.collect_stats:
+            self.depth[kanji] = depth
+        return refined_components
 
-    # パーツ数が多すぎる(5個以上)はゲーム的に厳しいのでNG
-    if len(refined_components) > 4:
+# --jobs 用: ワーカープロセスごとに1つだけ持つ分解エンジン
+_worker_engine = None
+
+def _init_worker(index_path, allowed_set, atomic_parts, collect_stats):
+    """IDSデータはタスクごとに送らず、各ワーカーが索引ファイルを mmap して共有する"""
+    global _worker_engine
+    _worker_engine = DecompositionEngine(IdsIndex(index_path), allowed_set, atomic_parts, collect_stats)
+
+def _decompose_chunk(chunk):
+    engine = _worker_engine
+    before = len(engine.cycles)
+    results = [engine.decompose(kanji) for kanji in chunk]
+    return results, engine.cycles[before:], target_stats(engine, chunk)
+
+def target_stats(engine, targets):
+    """対象文字ごとの (分解の深さ, 分解できなかった理由)。--metrics 指定時のみ"""
+    if not engine.collect_stats:
         return None
+    return [(engine.depth.get(kanji), engine.rejects.get(kanji)) for kanji in targets]
+
+def record_target_stats(metrics, stats):
+    """対象文字1つにつき1回だけ数える（ワーカー内の途中の分解は数えない）"""
+    for depth, reason in stats:
+        if depth is not None:
+            metrics.observe("decompose_depth", depth)
+        if reason is not None:
+            metrics.count(reason)
+
+def decompose_targets(targets, ids_db, allowed_set, atomic_parts, jobs=1, metrics=None):
+    """
+    対象文字をまとめて分解する
+    jobs > 1 ならプロセスプールで分担し、結果は targets の順に並べ直す（直列実行と同じ出力になる）
+    metrics が有効なら、対象文字ごとの分解できなかった理由と分解の深さのヒストグラムを親プロセスで集計する
+    戻り値: (文字 -> 分解結果, 循環参照のリスト)
+    """
+    collect_stats = metrics is not None and metrics.enabled
+
+    if jobs <= 1 or not targets:
+        engine = DecompositionEngine(ids_db, allowed_set, atomic_parts, collect_stats)
+        decompositions = engine.decompose_all(targets)
+        if collect_stats:
+            record_target_stats(metrics, target_stats(engine, targets))
+        return decompositions, sorted(engine.cycles)
+
+    # 負荷の偏りを均すため、ワーカー数より細かく区切る
+    chunk_size = max(1, -(-len(targets) // (jobs * 4)))
+    chunks = [targets[i:i + chunk_size] for i in range(0, len(targets), chunk_size)]
+
+    decompositions = {}
+    cycles = set()
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker,
+        initargs=(INDEX_FILE, allowed_set, atomic_parts, collect_stats)
+    ) as executor:
+        for chunk, (results, chunk_cycles, stats) in zip(chunks, executor.map(_decompose_chunk, chunks)):
+            decompositions.update(zip(chunk, results))
+            cycles.update(tuple(path) for path in chunk_cycles)
+            if collect_stats:
+                record_target_stats(metrics, stats)
+
+    return decompositions, [list(path) for path in sorted(cycles)]
+
+def enumerate_merge_trees(parts):
+    """
+    parts を並び順を保ったまま2つずつ合体させる全パターン（2分木）を返す
+    先頭は従来どおり左から順に組む形 ( ((A, B), C) )
+    """
+    if len(parts) == 1:
+        return [parts[0]]
+    trees = []
+    for k in range(len(parts) - 1, 0, -1):
+        for left in enumerate_merge_trees(parts[:k]):
+            for right in enumerate_merge_trees(parts[k:]):
+                trees.append((left, right))
+    return trees
+
+def inner_nodes(tree):
+    """根を除いた内部ノード（＝中間パーツになる部分木）"""
+    nodes = []
+    for child in tree:
+        if isinstance(child, tuple):
+            nodes.extend(inner_nodes(child))
+            nodes.append(child)
+    return nodes
+
+def plan_merge_trees(multi_part, pool):
+    """
+    各漢字の組み方を決め、中間パーツを登録しながら [左, 右] のレシピにする
+    既存の文字で作れる部分木はコスト0、新しい中間パーツは「使い回せる漢字の数」で割ったコストとし、
+    合計が最小の組み方を選ぶ（＝共有が最大になる）
+    根のペアが既に別の文字のレシピになっている組み方は選ばない（合体結果が曖昧になるため）
+    部分木のパーツ列が別の漢字の分解と同じなら、中間パーツではなくその漢字を使う（墜 = 隊 + 土 など）
+    パーツ数の少ない漢字から決める（大きい漢字の中間パーツが、小さい漢字と同じペアを先に取らないように）
+    戻り値: 漢字 -> [左, 右]
+    """
+    for kanji, parts in multi_part.items():
+        pool.register_parts(kanji, parts)
+    options = {kanji: enumerate_merge_trees(parts) for kanji, parts in multi_part.items()}
+
+    usage = Counter()
+    for trees in options.values():
+        usage.update({node for tree in trees for node in inner_nodes(tree)})
 
-    return refined_components
+    def cost(tree):
+        return sum(0 if pool.find(node) else 1 / usage[node] for node in inner_nodes(tree))
+
+    recipes = {}
+    for kanji in sorted(multi_part, key=lambda k: len(multi_part[k])):
+        trees = [t for t in options[kanji] if pool.find_pair(t) in (None, kanji)]
+        if not trees:
+            # どう組んでも既存の文字と同じペアになる（元データの分解が重なっている）
+            pool.forced.add(kanji)
+            trees = options[kanji]
+        # 同点なら先頭（左から順に組む形）を採用
+        tree = min(trees, key=cost)
+        recipes[kanji] = [pool.intern(tree[0]), pool.intern(tree[1])]
+        pool.register(kanji, recipes[kanji])
+    return recipes
+
+def flatten_tree(tree):
+    if isinstance(tree, tuple):
+        return [c for child in tree for c in flatten_tree(child)]
+    return [tree]
+
+class IntermediatePool:
+    """
+    ハッシュコンシングした中間パーツ
+    同じペア（合体は順不同なので merge_key で同一視）には常に同じ文字を返す
+    2パーツの既存レシピ、または同じパーツ列に分解される漢字があればその漢字を使い回し、
+    なければ "&" + 構成文字 のIDで1回だけ辞書に登録する
+    """
+    def __init__(self, dictionary):
+        self.dictionary = dictionary
+        self.ids = {}
+        self.by_parts = {} # パーツ列 -> その並びに分解される漢字（3パーツ以上）
+        self.created = []
+        self.pending = set() # 作成済みで created_for() がまだ返していない中間パーツ
+        self.forced = set() # plan_merge_trees() で、根のペアの重なりを避けられなかった漢字
+
+    def register(self, name, parts):
+        """既存の2パーツレシピを登録する（先に登録されたものが優先）"""
+        if len(parts) == 2:
+            self.ids.setdefault(merge_key(*parts), name)
+
+    def register_parts(self, name, parts):
+        """3パーツ以上の漢字の分解を登録する（先に登録されたものが優先）"""
+        self.by_parts.setdefault(tuple(parts), name)
+
+    def find(self, node):
+        """作成せずに、既に存在する文字/中間パーツを探す"""
+        if not isinstance(node, tuple):
+            return node
+        kanji = self.by_parts.get(tuple(flatten_tree(node)))
+        if kanji:
+            return kanji
+        return self.find_pair(node)
+
+    def find_pair(self, node):
+        """node の左右を合体させてできる既存の文字（パーツ列の登録は見ない＝根のペアの衝突判定用）"""
+        left, right = self.find(node[0]), self.find(node[1])
+        if left is None or right is None:
+            return None
+        return self.ids.get(merge_key(left, right))
+
+    def intern(self, node):
+        if not isinstance(node, tuple):
+            return node
+        kanji = self.by_parts.get(tuple(flatten_tree(node)))
+        if kanji:
+            return kanji
+
+        pair = [self.intern(node[0]), self.intern(node[1])]
+        key = merge_key(*pair)
+        if key in self.ids:
+            return self.ids[key]
+
+        base = "&" + "".join(flatten_tree(node))
+        inter_id = base
+        suffix = 2
+        # 組み方違い・手動設定とIDが被ったら連番を付ける
+        while inter_id in self.dictionary:
+            inter_id = f"{base}_{suffix}"
+            suffix += 1
+
+        self.ids[key] = inter_id
+        self.created.append(inter_id)
+        self.pending.add(inter_id)
+        self.dictionary[inter_id] = pair
+        return inter_id
+
+    def created_for(self, parts):
+        """parts が使う作成済みの中間パーツのうち未出力のものを、依存先が先に来る順で返す"""
+        entries = []
+        for p in parts:
+            if p in self.pending:
+                self.pending.discard(p)
+                entries.extend(self.created_for(self.dictionary[p]))
+                entries.append((p, self.dictionary[p]))
+        return entries
+
+def chain_left_to_right(kanji, parts, dictionary):
+    """従来の中間パーツ化（漢字ごとに &漢字_連番 を作る）。削減量の比較用"""
+    current_parts = parts[:]
+    step = 0
+    while len(current_parts) > 2:
+        p1 = current_parts.pop(0)
+        p2 = current_parts.pop(0)
+        inter_id = f"&{kanji}_{step}"
+        step += 1
+        dictionary[inter_id] = [p1, p2]
+        current_parts.insert(0, inter_id)
+    dictionary[kanji] = current_parts
+
+def dictionary_size(dictionary):
+    return len(json.dumps(dictionary, ensure_ascii=False, indent=2).encode("utf-8"))
+
+def report_intermediate_savings(final_dictionary, multi_part, pool):
+    """中間パーツの共有でどれだけ減ったかを、従来方式で作った場合と比較して表示する"""
+    created = set(pool.created)
+    naive_dictionary = {k: v for k, v in final_dictionary.items() if k not in created}
+    for kanji, parts in multi_part.items():
+        chain_left_to_right(kanji, parts, naive_dictionary)
+
+    naive_entries = sum(len(parts) - 2 for parts in multi_part.values())
+    saved = naive_entries - len(pool.created)
+    naive_size = dictionary_size(naive_dictionary)
+    shared_size = dictionary_size(final_dictionary)
+    reduction = (1 - shared_size / naive_size) * 100 if naive_size else 0.0
+
+    print(f"♻️ 中間パーツ: {len(pool.created)} 個（従来方式 {naive_entries} 個, {saved} 個削減）")
+    print(f"   辞書サイズ: {naive_size / 1024:.1f}KB -> {shared_size / 1024:.1f}KB（{reduction:.1f}% 削減）")
+
+def merge_key(p1, p2):
+    """
+    順不同ペアのキー（merger.ts と同じ規則）
+    JS の文字列比較に合わせて UTF-16 のコード単位順で並べる
+    """
+    a, b = sorted((p1, p2), key=lambda p: p.encode("utf-16-be"))
+    return f"{a}+{b}"
+
+def build_merge_index(dictionary):
+    """
+    2パーツのレシピからペア索引を作る
+    同じペアが複数の結果を持つ場合は、辞書順で最初のもの（従来の judgeMerge の走査結果）を採用し、
+    衝突として別途返す
+    戻り値: (ペア -> 結果, ペア -> 候補リスト)
+    """
+    candidates = {}
+    for target, parts in dictionary.items():
+        if not isinstance(parts, list) or len(parts) != 2: continue
+        candidates.setdefault(merge_key(*parts), []).append(target)
+
+    merge_index = {key: targets[0] for key, targets in candidates.items()}
+    ambiguous = {key: targets for key, targets in candidates.items() if len(targets) > 1}
+    return merge_index, ambiguous
+
+def find_chaining_collisions(ambiguous, generated, source_ambiguous, forced):
+    """
+    曖昧なペアのうち、結果の1つが漢字で、どれかが中間パーツ化で作ったレシピのものを
+    (中間パーツ化が生んだもの, 元データの時点で避けられないもの) に分けて返す
+    元データ側とみなすのは、中間パーツ化の前から曖昧だったペア（十+早 など）と、
+    どの組み方でも根のペアが既存の文字と重なった漢字のもの（品/𠱠 など）
+    """
+    introduced, inherent = {}, {}
+    for key, targets in ambiguous.items():
+        if all(t.startswith("&") for t in targets) or not any(t in generated for t in targets):
+            continue
+        if key in source_ambiguous or any(t in forced for t in targets):
+            inherent[key] = targets
+        else:
+            introduced[key] = targets
+    return introduced, inherent
+
+def write_merge_index(dictionary, output_path=OUTPUT_MERGE_INDEX_FILE):
+    merge_index, ambiguous = build_merge_index(dictionary)
+
+    print(f"🔗 合体索引: {len(merge_index)} ペア")
+    if ambiguous:
+        print(f"⚠️ 複数の結果を持つペアが {len(ambiguous)} 件あります（先頭の結果を採用）")
+        for key, targets in ambiguous.items():
+            print(f"   {key} -> {' / '.join(targets)}")
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(merge_index, f, ensure_ascii=False, indent=2)
+
+    return merge_index, ambiguous
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="ids.txt と設定ファイルから合体辞書を生成する")
+    parser.add_argument(
+        "--rebuild-index", action="store_true",
+        help="IDS索引キャッシュ（tools/.cache/ids-index.bin）を強制的に作り直す"
+    )
+    parser.add_argument(
+        "--all-cjk", action="store_true",
+        help="常用漢字だけでなく、IDS定義のある CJK統合漢字すべてを対象にする"
+    )
+    parser.add_argument(
+        "--jobs", type=int, default=1, metavar="N",
+        help="分解を N プロセスで並列実行する（出力は直列実行と同一）"
+    )
+    parser.add_argument(
+        "--compact", action="store_true",
+        help="JSON に加えてコンパクトなバイナリ形式（ids-map-auto.bin）も出力する"
+    )
+    parser.add_argument(
+        "--metrics", metavar="PATH",
+        help="ステージごとの所要時間・分解の統計を JSON で書き出す"
+    )
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+    metrics = Metrics(enabled=bool(args.metrics))
     print("🔄 辞書を自動生成中（JSON設定読込モード）...")
     
     # 1. 設定ファイル読み込み
-    ATOMIC_PARTS, MANUAL_OVERRIDES = load_config()
+    with metrics.stage("config_load"):
+        ATOMIC_PARTS, MANUAL_OVERRIDES = load_config()
 
-    allowed_set = load_joyo_kanji(ATOMIC_PARTS)
-    ids_db = parse_ids_file(INPUT_IDS_FILE)
+    with metrics.stage("joyo_load"):
+        allowed_set = load_joyo_kanji(ATOMIC_PARTS)
+    # ids.txt は索引キャッシュ経由で読む（変更がなければパースしない）
+    with metrics.stage("ids_load"):
+        ids_db, index_stats = load_ids_db(INPUT_IDS_FILE, rebuild=args.rebuild_index)
+    if index_stats:
+        print(format_stats(index_stats))
+    if args.all_cjk:
+        add_cjk_unified(allowed_set, ids_db)
+        print(f"🈶 CJK統合漢字モード: 対象 {len(allowed_set)} 文字")
     final_dictionary = {}
     
     # 2. 手動オーバーライドを適用
     for k, v in MANUAL_OVERRIDES.items():
         final_dictionary[k] = v
 
-    # 3. 自動分解
-    count = 0
-    for kanji in allowed_set:
-        if kanji in final_dictionary: continue
-        if kanji in ATOMIC_PARTS: continue
+    # 3. 自動分解（グラフ全体を依存順に1回ずつ分解してメモする）
+    # 出力順を実行ごとに揃えるため、対象はコードポイント順に処理する
+    targets = [k for k in sorted(allowed_set) if k not in final_dictionary and k not in ATOMIC_PARTS]
+    jobs = args.jobs if index_stats else 1
+    with metrics.stage("decompose"):
+        decompositions, cycles = decompose_targets(targets, ids_db, allowed_set, ATOMIC_PARTS, jobs, metrics)
 
-        # atomic_partsも渡す
-        clean_parts = deep_decompose(kanji, ids_db, allowed_set, ATOMIC_PARTS)
-        
-        # 2〜4要素なら採用
-        if clean_parts and 2 <= len(clean_parts) <= 4:
-            if len(clean_parts) == 2:
-                final_dictionary[kanji] = clean_parts
-            else:
-                # 3要素以上は中間パーツ化 ( [A, B, C] -> A + &BC )
-                current_parts = clean_parts[:]
-                intermediate_base = f"&{kanji}"
-                step = 0
-                
-                while len(current_parts) > 2:
-                    p1 = current_parts.pop(0)
-                    p2 = current_parts.pop(0)
-                    inter_id = f"{intermediate_base}_{step}"
-                    step += 1
-                    
-                    final_dictionary[inter_id] = [p1, p2]
-                    current_parts.insert(0, inter_id)
-                
-                final_dictionary[kanji] = current_parts
-            count += 1
+    with metrics.stage("chain"):
+        # 3要素以上は中間パーツ化する。同じペアは全漢字で1つの中間パーツを共有する
+        multi_part = {
+            k: p for k, p in decompositions.items()
+            if p and 3 <= len(p) <= 4
+        }
+        # 中間パーツはレシピを決めながら作業用の辞書に登録し、使う漢字の直前に並べて出力する
+        pool = IntermediatePool(dict(final_dictionary))
+        # 中間パーツ化の前の2パーツのレシピ（この時点で既に曖昧なペアは元データの問題）
+        source_pairs = dict(final_dictionary)
+        for kanji in targets:
+            if decompositions[kanji] and len(decompositions[kanji]) == 2:
+                source_pairs[kanji] = decompositions[kanji]
+        for k, p in source_pairs.items():
+            pool.register(k, p)
+        recipes = plan_merge_trees(multi_part, pool)
+
+        count = 0
+        for kanji in targets:
+            clean_parts = decompositions[kanji]
+            
+            # 2〜4要素なら採用
+            if clean_parts and 2 <= len(clean_parts) <= 4:
+                if len(clean_parts) == 2:
+                    final_dictionary[kanji] = clean_parts
+                else:
+                    # ( [A, B, C] -> &AB + C など、共有の多い組み方を選ぶ )
+                    final_dictionary.update(pool.created_for(recipes[kanji]))
+                    final_dictionary[kanji] = recipes[kanji]
+                count += 1
+            elif clean_parts is not None:
+                # 分解しても1パーツ以下にしかならない（合体で作れない）
+                metrics.count("reject_too_few_parts")
+
+    report_intermediate_savings(final_dictionary, multi_part, pool)
+
+    if cycles:
+        print(f"⚠️ 循環参照を {len(cycles)} 件検出しました（分解不能として扱います）")
+        for path in cycles:
+            print(f"   🔁 {' → '.join(path)}")
 
     print(f"📦 生成完了: {len(final_dictionary)} 漢字")
+
+    # 中間パーツ化が漢字のレシピと同じペアを作っていたら、その漢字がゲームで作れなくなるので止める
+    # 元データの時点で避けられないもの（--all-cjk で多い）は警告だけにする
+    collisions, inherent = find_chaining_collisions(
+        build_merge_index(final_dictionary)[1], set(pool.created) | set(recipes),
+        build_merge_index(source_pairs)[1], pool.forced,
+    )
+    if inherent:
+        print(f"⚠️ 元データの時点で同じペアになる漢字が {len(inherent)} 件あります（ids.txt の分解が重複しています）")
+        for key, targets in list(inherent.items())[:20]:
+            print(f"   {key} -> {' / '.join(targets)}")
+    if collisions:
+        print(f"❌ 中間パーツ化で漢字と同じペアが {len(collisions)} 件できました（出力しません）")
+        for key, targets in collisions.items():
+            print(f"   {key} -> {' / '.join(targets)}")
+        sys.exit(1)
     
-    os.makedirs(os.path.dirname(OUTPUT_JSON_FILE), exist_ok=True)
-    with open(OUTPUT_JSON_FILE, "w", encoding="utf-8") as f:
-        json.dump(final_dictionary, f, ensure_ascii=False, indent=2)
+    with metrics.stage("write"):
+        os.makedirs(os.path.dirname(OUTPUT_JSON_FILE), exist_ok=True)
+        with open(OUTPUT_JSON_FILE, "w", encoding="utf-8") as f:
+            json.dump(final_dictionary, f, ensure_ascii=False, indent=2)
+
+        # 4. 合体判定用のペア索引も一緒に出力する
+        write_merge_index(final_dictionary)
+
+        if args.compact:
+            write_compact(final_dictionary, encode_ids_map, decode_ids_map, IDS_MAP_BIN)
+            compare_formats(final_dictionary, encode_ids_map, decode_ids_map, "ids-map")
+
+    if args.metrics:
+        metrics.count("targets", len(targets))
+        metrics.count("generated_kanji", count)
+        metrics.count("intermediates", len(pool.created))
+        metrics.count("cycles", len(cycles))
+        metrics.write(args.metrics)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
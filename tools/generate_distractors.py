@@ -0,0 +1,132 @@
+import json
+import os
+
+from validate_stages import StageSolver, load_generator_tables, load_json, load_jukugo_db, stage_parts
+
+# ==========================================
+# 設定
+# ==========================================
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(CURRENT_DIR, "../src/features/kanji-core/data")
+JUKUGO_DB_FILE = os.path.join(DATA_DIR, "jukugo-db-auto.json")
+MERGE_INDEX_FILE = os.path.join(DATA_DIR, "merge-index-auto.json")
+CONFIG_FILE = os.path.join(CURRENT_DIR, "dictionary_config.json")
+# 出力: 熟語（表記） -> 段階ごとの安全なダミー候補
+# ※ IDは生成のたびに変わりうるので、キーには熟語そのものを使う
+OUTPUT_FILE = os.path.join(DATA_DIR, "distractor-pool-auto.json")
+
+# 1段階あたりの候補数（盤面に入るダミーは最大6個）
+TIER_SIZE = 8
+
+# 段階（難しいモードほど前の段階から使う）
+#   0: 見た目が紛らわしい文字（generator.ts の CONFUSING_PAIRS）
+#   1: 構造が似ている部品（正解パーツと同じ相手と合体する部品）
+#   2: 汎用のダミー（DEFAULT_DISTRACTORS、足りなければ問題DBでよく使われる部品）
+TIER_VISUAL, TIER_STRUCTURAL, TIER_GENERIC = range(3)
+
+def build_partners(merge_index):
+    """ペア合体の関係: 文字 -> 合体できる相手の集合"""
+    partners = {}
+    for pair in merge_index:
+        a, b = pair.split("+")
+        partners.setdefault(a, set()).add(b)
+        partners.setdefault(b, set()).add(a)
+    return partners
+
+def similarity(a, b, partners):
+    """合体相手の重なり（Jaccard）＝ 盤面で同じ役割に見えやすい度合い"""
+    pa, pb = partners.get(a), partners.get(b)
+    if not pa or not pb:
+        return 0.0
+    return len(pa & pb) / len(pa | pb)
+
+class DistractorPlanner:
+    """熟語ごとに、どの正解パーツ・途中の文字とも合体しないダミー候補を段階別に選ぶ"""
+    def __init__(self, merge_index, atomic_parts, confusing, defaults, jukugo_db):
+        self.merge_index = merge_index
+        self.partners = build_partners(merge_index)
+        self.confusing = confusing
+        self.defaults = defaults
+        # 中間パーツ（&...）は表示が崩れるのでダミーにしない
+        self.universe = sorted(
+            {p for p in atomic_parts if not p.startswith("&")}
+            | {c for values in confusing.values() for c in values}
+            | set(defaults)
+        )
+        # 見慣れた部品から順に（汎用ダミーの補充用）
+        usage = {}
+        for jukugo in jukugo_db:
+            for char in stage_parts(jukugo, "NORMAL"):
+                usage[char] = usage.get(char, 0) + 1
+        self.common = sorted(
+            (c for c in self.universe if c in usage), key=lambda c: (-usage[c], c)
+        )
+
+    def reachable(self, jukugo):
+        """盤面に現れうる文字（正解パーツ・途中でできる文字・ゴールの文字）"""
+        parts = stage_parts(jukugo, "NORMAL")
+        solver = StageSolver(self.merge_index, 1)
+        solver.solve(parts, jukugo["components"])
+        return solver.seen_chars | set(parts) | set(jukugo["components"])
+
+    def plan(self, jukugo):
+        reachable = self.reachable(jukugo)
+        parts = stage_parts(jukugo, "NORMAL")
+        accepted = set()
+        tiers = [[], [], []]
+
+        def offer(tier, char):
+            """合体の相手が盤面にもプール内にもいなければ採用（サンプルの組み合わせによらず安全）"""
+            if len(tiers[tier]) >= TIER_SIZE or char in reachable or char in accepted:
+                return
+            partners = self.partners.get(char, set())
+            if partners & reachable or partners & accepted:
+                return
+            accepted.add(char)
+            tiers[tier].append(char)
+
+        for char in parts:
+            for c in self.confusing.get(char, []):
+                offer(TIER_VISUAL, c)
+
+        scored = []
+        for c in self.universe:
+            score = max((similarity(c, p, self.partners) for p in set(parts)), default=0.0)
+            if score > 0:
+                scored.append((-score, c))
+        for _, c in sorted(scored):
+            offer(TIER_STRUCTURAL, c)
+
+        for c in self.defaults:
+            offer(TIER_GENERIC, c)
+        for c in self.common:
+            offer(TIER_GENERIC, c)
+
+        return [" ".join(t) for t in tiers]
+
+def load_atomic_parts():
+    config_data = load_json(CONFIG_FILE) or {}
+    return set(config_data.get("atomic_parts", []))
+
+def main():
+    jukugo_db = load_jukugo_db(JUKUGO_DB_FILE)
+    merge_index = load_json(MERGE_INDEX_FILE)
+    if jukugo_db is None or merge_index is None:
+        print("❌ jukugo-db-auto.json / merge-index-auto.json が見つかりません。先に生成してください。")
+        return
+    _, confusing, defaults = load_generator_tables()
+
+    print("🎲 ダミー候補の事前計算...")
+    planner = DistractorPlanner(merge_index, load_atomic_parts(), confusing, defaults, jukugo_db)
+    pools = {jukugo["kanji"]: planner.plan(jukugo) for jukugo in jukugo_db}
+
+    short = [j["kanji"] for j in jukugo_db if sum(len(t.split()) for t in pools[j["kanji"]]) < 6]
+    if short:
+        print(f"⚠️ 安全なダミーが6個未満の熟語: {', '.join(short)}")
+
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        json.dump(pools, f, ensure_ascii=False, indent=2)
+    print(f"✅ 保存完了: {OUTPUT_FILE}（{len(pools)} 件）")
+
+if __name__ == "__main__":
+    main()
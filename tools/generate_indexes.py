@@ -0,0 +1,137 @@
+import json
+import os
+import re
+
+from recipe_graph import strongly_connected_components
+
+# ==========================================
+# 設定
+# ==========================================
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(CURRENT_DIR, "../src/features/kanji-core/data")
+IDS_MAP_FILE = os.path.join(DATA_DIR, "ids-map-auto.json")
+JUKUGO_DB_FILE = os.path.join(DATA_DIR, "jukugo-db-auto.json")
+# 出力: 図鑑・コレクション画面用の転置インデックス（クライアントが読み込む分だけ）
+OUTPUT_FILE = os.path.join(DATA_DIR, "inverted-index-auto.json")
+# 出力: ツール用の転置インデックス（画面では使わないのでバンドルに入れない）
+TOOLING_OUTPUT_FILE = os.path.join(CURRENT_DIR, ".cache", "tooling-index.json")
+
+# クライアント用に書き出すセクション（残りはツール用）
+CLIENT_SECTIONS = ["collection", "byKanji"]
+
+# 図鑑に載せる文字（DictionaryView.tsx / KanjiListView.tsx と同じ条件）
+COLLECTION_PATTERN = re.compile(r"[一-龠々〆ヵヶ]+")
+
+# クライアント用セクションのサイズ予算（KB）。超えたら警告する
+SIZE_BUDGET_KB = {
+    "collection": 16,
+    "byKanji": 32,
+}
+
+def load_json(filepath):
+    if not os.path.exists(filepath):
+        return None
+    with open(filepath, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def js_order(s):
+    """JS の sort() と同じ並び（UTF-16 のコード単位順）"""
+    return s.encode("utf-16-be")
+
+def build_collection(ids_map):
+    """図鑑の対象文字: レシピの成果物と素材のうち、中間パーツや記号を除いたもの"""
+    chars = set(ids_map)
+    for parts in ids_map.values():
+        chars.update(parts)
+    return sorted((c for c in chars if COLLECTION_PATTERN.fullmatch(c)), key=js_order)
+
+def build_component_index(ids_map):
+    """
+    部品 -> その部品を（中間パーツ経由も含めて）使っている漢字
+    依存順に子孫の集合を1回ずつ作り、それを反転する（循環しているレシピ同士は子孫を共有する）
+    """
+    def children(char):
+        return [p for p in ids_map[char] if p in ids_map]
+
+    descendants = {}
+    for scc in strongly_connected_components(list(ids_map), children):
+        members = set(scc)
+        shared = set()
+        for char in scc:
+            for p in ids_map[char]:
+                shared.add(p)
+                if p in descendants and p not in members:
+                    shared |= descendants[p]
+        for char in scc:
+            descendants[char] = shared - {char}
+
+    index = {}
+    for kanji, parts in descendants.items():
+        if not COLLECTION_PATTERN.fullmatch(kanji):
+            continue # 中間パーツ自体は一覧に出さない
+        for part in parts:
+            if part.startswith("&"):
+                continue
+            index.setdefault(part, []).append(kanji)
+    return {part: sorted(index[part], key=js_order) for part in sorted(index, key=js_order)}
+
+def build_posting_lists(jukugo_db, keys_of):
+    """
+    キー -> 熟語IDのリスト（問題DBの並び＝ソースの並び）
+    ※ IDはランダムなので、ID順に並べると図鑑の表示順がばらばらになる
+    """
+    index = {}
+    for jukugo in jukugo_db:
+        for key in set(keys_of(jukugo)):
+            index.setdefault(key, []).append(jukugo["id"])
+    return {key: index[key] for key in sorted(index, key=js_order)}
+
+def build_indexes(ids_map, jukugo_db):
+    return {
+        "collection": build_collection(ids_map),
+        "byComponent": build_component_index(ids_map),
+        "byKanji": build_posting_lists(jukugo_db, lambda j: j["components"]),
+        "byReading": build_posting_lists(jukugo_db, lambda j: [j["reading"]]),
+    }
+
+def split_indexes(indexes):
+    """クライアント用とツール用に分ける"""
+    client = {name: indexes[name] for name in CLIENT_SECTIONS}
+    tooling = {name: section for name, section in indexes.items() if name not in CLIENT_SECTIONS}
+    return client, tooling
+
+def report_sizes(indexes):
+    """セクションごとのサイズを予算と比べて表示する。戻り値: 予算内に収まったか"""
+    ok = True
+    for name, section in indexes.items():
+        size_kb = len(json.dumps(section, ensure_ascii=False, separators=(",", ":")).encode("utf-8")) / 1024
+        budget = SIZE_BUDGET_KB[name]
+        mark = "✅" if size_kb <= budget else "⚠️"
+        ok = ok and size_kb <= budget
+        print(f"   {mark} {name}: {len(section)} 件 / {size_kb:.1f}KB（予算 {budget}KB）")
+    return ok
+
+def main():
+    ids_map = load_json(IDS_MAP_FILE)
+    jukugo_db = load_json(JUKUGO_DB_FILE)
+    if ids_map is None or jukugo_db is None:
+        print("❌ ids-map-auto.json / jukugo-db-auto.json が見つかりません。先に生成してください。")
+        return
+
+    print("📇 転置インデックスを生成中...")
+    client, tooling = split_indexes(build_indexes(ids_map, jukugo_db))
+    if not report_sizes(client):
+        print("⚠️ サイズ予算を超えたセクションがあります（画面ごとの分割を検討してください）")
+
+    # クライアントが丸ごと読み込むので、空白なしで書き出してサイズを抑える
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        json.dump(client, f, ensure_ascii=False, separators=(",", ":"))
+    print(f"✅ 保存完了: {OUTPUT_FILE}")
+
+    os.makedirs(os.path.dirname(TOOLING_OUTPUT_FILE), exist_ok=True)
+    with open(TOOLING_OUTPUT_FILE, "w", encoding="utf-8") as f:
+        json.dump(tooling, f, ensure_ascii=False, indent=2)
+    print(f"✅ 保存完了: {TOOLING_OUTPUT_FILE}（ツール用: {', '.join(tooling)}）")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
+import argparse
+import hashlib
 import json
 import os
-import uuid
+
+from compact_format import JUKUGO_DB_BIN, compare_formats, decode_jukugo_db, encode_jukugo_db, write_compact
+from recipe_graph import find_cycle, strongly_connected_components
+from source_reader import iter_source_lines, print_problems
 
 # ==========================================
 # 設定
@@ -15,8 +20,28 @@ INPUT_FILES = [
 
 # 入力: 前回作った辞書（パーツ構成を確認するため）
 INPUT_IDS_FILE = os.path.join(CURRENT_DIR, "../src/features/kanji-core/data/ids-map-auto.json")
+# 入力: 原子パーツの定義（辞書生成と同じ基準で合体手順を作る）
+CONFIG_FILE = os.path.join(CURRENT_DIR, "dictionary_config.json")
 # 出力: ゲーム用の問題DB
 OUTPUT_DB_FILE = os.path.join(CURRENT_DIR, "../src/features/kanji-core/data/jukugo-db-auto.json")
+# 出力: 難易度帯ごとに分割した問題DB + マニフェスト（画面ごとに必要な帯だけ読み込む）
+SHARD_DIR = os.path.join(CURRENT_DIR, "../src/features/kanji-core/data/shards")
+MANIFEST_FILE = os.path.join(SHARD_DIR, "manifest.json")
+# 難易度帯（generator.ts の出題範囲の区切りに合わせる）
+#   d1-3: ステージ4〜5・EASY / d4-5: ステージ6〜9 の上限まで / d6-10: ボス・ステージ10以降
+# ※ 帯を変えたら jukugoShards.ts の読み込み表も合わせること
+DIFFICULTY_BANDS = [("d1-3", 1, 3), ("d4-5", 4, 5), ("d6-10", 6, 10)]
+# 難易度の加点: 原子パーツ数がこの値以上の文字1つにつき、値ごとに +1（2で+1, 3で+2, 4以上で+3。同じ値を重ねてもよい）
+# ※ analyze_corpus.py が難易度帯の偏りから見直し案を出す
+DIFFICULTY_COST_THRESHOLDS = (2, 3, 4)
+# 出力: 文字ごとの原子パーツ数（難易度計算に使った表）
+OUTPUT_COST_FILE = os.path.join(CURRENT_DIR, "../src/features/kanji-core/data/atomic-cost-auto.json")
+# 出力: 問題DBに出てくる文字ごとの原子パーツ（ステージ生成用。同じ文字の分解は熟語ごとに持たず1回だけ書く）
+OUTPUT_ATOMS_FILE = os.path.join(CURRENT_DIR, "../src/features/kanji-core/data/atom-parts-auto.json")
+# 差分ビルド用キャッシュ（ソース行 + 依存レシピのハッシュ -> 生成済みエントリ）
+CACHE_DIR = os.path.join(CURRENT_DIR, ".cache")
+BUILD_CACHE_FILE = os.path.join(CACHE_DIR, "jukugo-build-cache.json")
+BUILD_CACHE_VERSION = 6
 
 def load_ids_map():
     """分解辞書を読み込む"""
@@ -27,99 +52,341 @@ def load_ids_map():
         print("❌ ids-map-auto.json が見つかりません。先に辞書生成を行ってください。")
         return {}
 
-def calculate_difficulty(kanji_list, ids_map):
+def load_atomic_parts():
+    """dictionary_config.json の原子パーツを読み込む"""
+    if not os.path.exists(CONFIG_FILE):
+        print("⚠️ dictionary_config.json が見つかりません（原子パーツなしで合体手順を作ります）")
+        return set()
+    with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+        return set(json.load(f).get("atomic_parts", []))
+
+def build_atomic_cost_table(ids_map):
+    """
+    全文字の「原子パーツがいくつ必要か」を依存順の動的計画法で1回だけ計算する
+    （& 始まりの中間パーツも同じ辞書のキーなので、そのまま展開される）
+    循環しているレシピ同士は、互いをコスト1（分解できない部品）として扱う
+    戻り値: (文字 -> コスト, 循環参照のリスト)
+    """
+    def children(char):
+        return [p for p in ids_map[char] if p in ids_map]
+
+    costs = {}
+    cycles = []
+    for scc in strongly_connected_components(list(ids_map), children):
+        members = set(scc) if len(scc) > 1 else ()
+        if members:
+            cycles.append(find_cycle(min(scc), members, children))
+        for char in scc:
+            costs[char] = sum(
+                1 if p in members else costs.get(p, 1) # 分解できない＝コスト1
+                for p in ids_map[char]
+            )
+    return costs, cycles
+
+def build_merge_plans(ids_map, atomic_parts):
+    """
+    原子パーツ（dictionary_config.json）を基準に、全文字の合体手順を依存順に1回だけ計算する
+    合体手順は "部品+部品=結果" を作る順（帰りがけ順）に並べたもの
+    原子パーツ・レシピのない文字・循環しているレシピ同士はそれ以上分解しない
+    戻り値: 文字 -> (原子パーツのリスト, 合体手順のリスト)
+    """
+    def children(char):
+        return [p for p in ids_map[char] if p in ids_map and p not in atomic_parts]
+
+    plans = {}
+    nodes = [k for k in ids_map if k not in atomic_parts]
+    for scc in strongly_connected_components(nodes, children):
+        members = set(scc) if len(scc) > 1 else ()
+        for char in scc:
+            recipe = ids_map[char]
+            atoms, steps = [], []
+            for p in recipe:
+                sub_atoms, sub_steps = ([p], []) if p in members else plans.get(p, ([p], []))
+                atoms.extend(sub_atoms)
+                steps.extend(sub_steps)
+            if len(recipe) > 1:
+                steps.append(f"{'+'.join(recipe)}={char}")
+            plans[char] = (atoms, steps)
+    return plans
+
+def build_atom_parts(jukugo_list, merge_plans):
+    """
+    問題DBに出てくる文字 -> 原子パーツ（空白区切り）
+    ※ 原子パーツには "&朝_左" のような複数文字の中間パーツもあるので区切り文字を入れる
+    """
+    chars = sorted({c for j in jukugo_list for c in j["components"]})
+    return {c: " ".join(merge_plans.get(c, ([c], []))[0]) for c in chars}
+
+def attach_atoms(jukugo_list, atom_parts):
+    """ツール用: build_atom_parts() の表から、熟語ごとの atoms（構成文字ごとの原子パーツ）を付ける"""
+    for j in jukugo_list:
+        j["atoms"] = [atom_parts.get(c, c) for c in j["components"]]
+    return jukugo_list
+
+def jukugo_merge_plan(kanji_list, merge_plans):
+    """
+    熟語1つ分の合体手順（build_merge_plans() の表を引くだけ）
+    戻り値: (漢字ごとの原子パーツを空白区切りにした文字列のリスト, 合体手順のリスト)
+    ※ 原子パーツには "&朝_左" のような複数文字の中間パーツもあるので区切り文字を入れる
+    """
+    atoms, steps = [], []
+    for k in kanji_list:
+        k_atoms, k_steps = merge_plans.get(k, ([k], []))
+        atoms.append(" ".join(k_atoms))
+        steps.extend(k_steps)
+    return atoms, steps
+
+def calculate_difficulty(kanji_list, atomic_costs):
     """
     分解の複雑さと文字数から難易度(1-10)を算出する
-    （中間パーツも再帰的にカウントして精度を上げる）
+    （構成コストは build_atomic_cost_table() の表を引くだけ）
     """
     score = 0
     score += len(kanji_list) # 文字数ベース
-    
-    # 構成コスト計算（原子パーツがいくつ必要か）
-    def count_atomic_cost(char, depth=0):
-        if depth > 5: return 1
-        if char not in ids_map: return 1 # 分解できない＝コスト1
-        
-        parts = ids_map[char]
-        cost = 0
-        for p in parts:
-            cost += count_atomic_cost(p, depth + 1)
-        return cost
 
     for k in kanji_list:
-        cost = count_atomic_cost(k)
-        if cost >= 4: score += 3
-        elif cost == 3: score += 2
-        elif cost == 2: score += 1
-    
+        cost = atomic_costs.get(k, 1)
+        score += sum(1 for t in DIFFICULTY_COST_THRESHOLDS if cost >= t)
+
     return min(10, max(1, score))
 
-def process_file(filepath, ids_map, jukugo_list):
-    """1つのファイルを処理してリストに追加する"""
-    if not os.path.exists(filepath):
-        print(f"⚠️ ファイルが見つかりません（スキップします）: {os.path.basename(filepath)}")
-        return
+def write_atomic_costs(atomic_costs, output_path=OUTPUT_COST_FILE):
+    """クライアントや検証ツールでも同じコストを使えるように書き出す"""
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(atomic_costs, f, ensure_ascii=False, indent=2)
 
-    print(f"📖 読み込み中: {os.path.basename(filepath)}")
-    
-    with open(filepath, "r", encoding="utf-8") as f:
-        content = f.read()
-        lines = content.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+def write_atom_parts(atom_parts, output_path=OUTPUT_ATOMS_FILE):
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(atom_parts, f, ensure_ascii=False, indent=2)
 
-    count = 0
-    for line in lines:
-        line = line.strip()
-        
-        # --- ▼ 判定ロジック強化 ---
-        # 空行、コメント、見出し行、カンマがない行を無視
-        if not line: continue
-        if line.startswith("#"): continue
-        if line.startswith("-") or line.startswith("["): continue
-        if "," not in line: continue  # ★重要: カンマがない行はデータではないのでスキップ
-        # ------------------------
-
-        parts = line.split(",")
+def write_shards(jukugo_list):
+    """
+    問題DBを難易度帯ごとのファイルに分け、件数・内容ハッシュ・難易度ごとのIDをマニフェストに書く
+    各シャードはソースの並びのまま（図鑑の一覧がこの順で表示される）
+    ※ ID はハッシュなので範囲では引けない。クライアントはマニフェストの ID だけでプレイリストを作り、
+       ID からシャードを選んで、その帯のシャードだけを読み込む
+    """
+    os.makedirs(SHARD_DIR, exist_ok=True)
+    shards = []
+    for name, lo, hi in DIFFICULTY_BANDS:
+        entries = [j for j in jukugo_list if lo <= j["difficulty"] <= hi]
+        data = json.dumps(entries, ensure_ascii=False, indent=2).encode("utf-8")
+        filename = f"jukugo-{name}.json"
+        with open(os.path.join(SHARD_DIR, filename), "wb") as f:
+            f.write(data)
+        shards.append({
+            "name": name,
+            "file": filename,
+            "difficulty": [lo, hi],
+            "count": len(entries),
+            "bytes": len(data),
+            "sha256": hashlib.sha256(data).hexdigest(),
+            "ids": {str(d): [j["id"] for j in entries if j["difficulty"] == d] for d in range(lo, hi + 1)},
+        })
+
+    manifest = {"total": len(jukugo_list), "shards": shards}
+    with open(MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+def load_previous_db():
+    """前回生成した問題DB（なければ空）"""
+    if not os.path.exists(OUTPUT_DB_FILE):
+        return []
+    with open(OUTPUT_DB_FILE, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def load_known_ids(previous_db):
+    """
+    既存DBのIDを引き継ぐための 熟語 -> ID
+    ※ 以前は BOM 付きのまま熟語に入っていたので、外した形でも引けるようにする
+    """
+    return {j["kanji"].lstrip("\ufeff"): j["id"] for j in previous_db if "kanji" in j and "id" in j}
+
+def stable_id(kanji, known_ids):
+    """前回と同じ熟語なら同じIDを返す（新規は熟語から決まるハッシュ）"""
+    if kanji in known_ids:
+        return known_ids[kanji]
+    return hashlib.sha1(kanji.encode("utf-8")).hexdigest()[:8]
+
+class BuildCache:
+    """
+    差分ビルド用のキャッシュ
+    各エントリを「ソース行 + 依存するレシピ」のハッシュで管理し、
+    変更のない行は再計算せずに前回の結果をそのまま使う
+    """
+    def __init__(self, ids_map, atomic_parts, previous_entries):
+        self.ids_map = ids_map
+        # 原子パーツが変われば合体手順も、難易度の閾値が変われば難易度も変わるので、全エントリのキーに混ぜる
+        h = hashlib.sha1("\0".join(sorted(atomic_parts)).encode("utf-8"))
+        h.update(f"\0thresholds={DIFFICULTY_COST_THRESHOLDS}".encode("utf-8"))
+        self.atomic_digest = h.hexdigest()
+        self.previous_entries = previous_entries
+        self.entries = {}
+        self.recipe_digests = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, ids_map, atomic_parts):
+        previous_entries = {}
+        if os.path.exists(BUILD_CACHE_FILE):
+            with open(BUILD_CACHE_FILE, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == BUILD_CACHE_VERSION:
+                previous_entries = data.get("entries", {})
+        return cls(ids_map, atomic_parts, previous_entries)
+
+    def recipe_digest(self, char):
+        """文字のレシピを末端まで辿ったハッシュ（どこかのレシピが変われば値も変わる）"""
+        if char in self.recipe_digests:
+            return self.recipe_digests[char]
+
+        # 循環参照で戻ってきた場合は文字そのものだけで打ち切る
+        self.recipe_digests[char] = hashlib.sha1(char.encode("utf-8")).hexdigest()
+
+        h = hashlib.sha1(char.encode("utf-8"))
+        for p in self.ids_map.get(char, []):
+            h.update(b"\0")
+            h.update(self.recipe_digest(p).encode("ascii"))
+        digest = h.hexdigest()
+        self.recipe_digests[char] = digest
+        return digest
+
+    def entry_key(self, line, kanji):
+        h = hashlib.sha1(line.encode("utf-8"))
+        h.update(self.atomic_digest.encode("ascii"))
+        for char in kanji:
+            h.update(b"\0")
+            h.update(self.recipe_digest(char).encode("ascii"))
+        return h.hexdigest()
+
+    def lookup(self, key):
+        entry = self.previous_entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries[key] = entry
+        return entry
+
+    def store(self, key, entry):
+        self.entries[key] = entry
+
+    def save(self):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(BUILD_CACHE_FILE, "w", encoding="utf-8") as f:
+            json.dump({"version": BUILD_CACHE_VERSION, "entries": self.entries}, f, ensure_ascii=False)
+
+def iter_jukugo_entries(rows, atomic_costs, merge_plans, seen_kanji, build_cache=None, known_ids=None):
+    """
+    ソースの行（iter_source_lines() の出力）から問題DBのエントリを1件ずつ作るジェネレーター
+    atomic_costs: build_atomic_cost_table() で作った 文字 -> 原子パーツ数
+    merge_plans: build_merge_plans() で作った 文字 -> (原子パーツ, 合体手順)（merges = 最小の合体回数）
+    seen_kanji: 追加済みの熟語（重複チェック用）
+    build_cache: 差分ビルド時のみ渡す
+    known_ids: 前回のDBの 熟語 -> ID（load_known_ids() を参照。差分ビルドかどうかによらず引き継ぐ）
+    """
+    known_ids = known_ids or {}
+    for _, line, parts in rows:
         kanji = parts[0].strip()
-        
-        # 漢字部分が空ならスキップ
-        if not kanji: continue
 
         # 重複チェック
-        if any(j["kanji"] == kanji for j in jukugo_list):
+        if kanji in seen_kanji:
             continue
+        seen_kanji.add(kanji)
+
+        # 差分ビルド: 行も依存レシピも変わっていなければ前回の結果を使う
+        if build_cache is not None:
+            key = build_cache.entry_key(line, kanji)
+            cached = build_cache.lookup(key)
+            if cached is not None:
+                yield cached
+                continue
 
         reading = parts[1].strip() if len(parts) > 1 else "???"
         meaning = parts[2].strip() if len(parts) > 2 else ""
         sentence = parts[3].strip() if len(parts) > 3 else ""
 
-        difficulty = calculate_difficulty(list(kanji), ids_map)
+        difficulty = calculate_difficulty(list(kanji), atomic_costs)
+        _, steps = jukugo_merge_plan(list(kanji), merge_plans)
         
         entry = {
-            "id": str(uuid.uuid4())[:8],
+            "id": stable_id(kanji, known_ids),
             "kanji": kanji,
             "reading": reading,
             "meaning": meaning,
             "difficulty": difficulty,
+            "merges": len(steps),
             "components": list(kanji),
             "sentence": sentence
         }
-        jukugo_list.append(entry)
-        count += 1
+        if build_cache is not None:
+            build_cache.store(key, entry)
+        yield entry
+
+def process_file(filepath, atomic_costs, merge_plans, jukugo_list, seen_kanji, build_cache=None, problems=None, known_ids=None):
+    """
+    1つのファイルを1行ずつ読み、できたエントリをリストに追加する
+    problems: 不正な行の報告先（source_reader.iter_source_lines() を参照）
+    """
+    if not os.path.exists(filepath):
+        print(f"⚠️ ファイルが見つかりません（スキップします）: {os.path.basename(filepath)}")
+        return
+
+    print(f"📖 読み込み中: {os.path.basename(filepath)}")
+
+    before = len(jukugo_list)
+    rows = iter_source_lines(filepath, problems)
+    jukugo_list.extend(iter_jukugo_entries(rows, atomic_costs, merge_plans, seen_kanji, build_cache, known_ids))
     
-    print(f"   -> {count} 件追加")
+    print(f"   -> {len(jukugo_list) - before} 件追加")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="熟語ソースからゲーム用の問題DBを生成する")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="差分ビルド: 変更のあった行だけ再計算する（IDは指定しなくても前回から引き継ぐ）"
+    )
+    parser.add_argument(
+        "--compact", action="store_true",
+        help="JSON に加えてコンパクトなバイナリ形式（jukugo-db-auto.bin）も出力する"
+    )
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
+
     ids_map = load_ids_map()
     if not ids_map: return
 
+    atomic_costs, cycles = build_atomic_cost_table(ids_map)
+    if cycles:
+        print(f"⚠️ 循環参照を {len(cycles)} 件検出しました（循環部分はコスト1として計算します）")
+        for path in cycles:
+            print(f"   🔁 {' → '.join(path)}")
+
+    atomic_parts = load_atomic_parts()
+    merge_plans = build_merge_plans(ids_map, atomic_parts)
+
     jukugo_list = []
+    seen_kanji = set()
+    problems = []
+    build_cache = BuildCache.load(ids_map, atomic_parts) if args.incremental else None
+    known_ids = load_known_ids(load_previous_db())
     
     # リストにある全ファイルを処理
     for filename in INPUT_FILES:
         filepath = os.path.join(CURRENT_DIR, filename)
-        process_file(filepath, ids_map, jukugo_list)
+        process_file(filepath, atomic_costs, merge_plans, jukugo_list, seen_kanji, build_cache, problems, known_ids)
+    print_problems(problems)
 
     print(f"📦 合計 {len(jukugo_list)} 件の熟語データを生成しました。")
+    if build_cache is not None:
+        build_cache.save()
+        print(f"♻️ 差分ビルド: 再利用 {build_cache.hits} 件 / 再計算 {build_cache.misses} 件")
     
     os.makedirs(os.path.dirname(OUTPUT_DB_FILE), exist_ok=True)
     with open(OUTPUT_DB_FILE, "w", encoding="utf-8") as f:
@@ -127,5 +394,22 @@ def main():
         
     print(f"✅ 保存完了: {OUTPUT_DB_FILE}")
 
+    manifest = write_shards(jukugo_list)
+    for shard in manifest["shards"]:
+        print(f"   🧩 {shard['file']}: {shard['count']} 件 / {shard['bytes'] / 1024:.1f}KB")
+    print(f"✅ 保存完了: {MANIFEST_FILE}")
+
+    write_atomic_costs(atomic_costs)
+    print(f"✅ 保存完了: {OUTPUT_COST_FILE}")
+
+    # ステージ開始時に再帰分解しなくて済むよう、文字ごとの原子パーツを書き出す
+    write_atom_parts(build_atom_parts(jukugo_list, merge_plans))
+    print(f"✅ 保存完了: {OUTPUT_ATOMS_FILE}")
+
+    if args.compact:
+        write_compact(jukugo_list, encode_jukugo_db, decode_jukugo_db, JUKUGO_DB_BIN)
+        compare_formats(jukugo_list, encode_jukugo_db, decode_jukugo_db, "jukugo-db")
+        print(f"✅ 保存完了: {JUKUGO_DB_BIN}")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,283 @@
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+
+from ids_index import IdsIndex, load_ids_db
+
+# ==========================================
+# 設定
+# ==========================================
+# 1文字でない名前（"&朝_左" などの中間パーツ）に振る番号の開始位置
+# Unicode の範囲外なので、コードポイントと衝突しない
+EXTRA_NAME_BASE = 0x110000
+
+# グラフの構成（ids_index.py の索引ファイルの keys / offsets / comps と同じ CSR 形式）
+#   heads[n]         : 見出しのノード番号（昇順）
+#   offsets[n + 1]   : comps 内の開始位置
+#   comps[total]     : 構成要素のノード番号を連結したもの
+#   rev_keys[m]      : 構成要素として使われているノード番号（昇順）
+#   rev_offsets[m+1] : parents 内の開始位置
+#   parents[total]   : その構成要素を使っている見出しのノード番号
+# ノード番号は1文字ならコードポイント、それ以外は EXTRA_NAME_BASE + 名前表の番号
+
+class CsrGraph(Mapping):
+    """
+    文字 -> 構成要素リスト のグラフを整数の配列（CSR）で持つ
+    dict と同じく graph[文字] で構成要素リストを返すので、DecompositionEngine などにそのまま渡せる
+    行（見出し）単位の処理は整数のまま行い、文字列は問い合わせの結果を返すときにだけ作る
+    """
+    def __init__(self, heads, offsets, comps, extra_names=()):
+        self.heads = heads
+        self.offsets = offsets
+        self.comps = comps
+        self.extra_names = list(extra_names)
+        self._extra_codes = {name: EXTRA_NAME_BASE + i for i, name in enumerate(self.extra_names)}
+        self._reverse = None
+        self._comp_rows = None
+
+    @classmethod
+    def from_mapping(cls, mapping):
+        """dict（ids.txt のパース結果や ids-map）から作る"""
+        extra_names = sorted({n for k, parts in mapping.items() for n in (k, *parts) if len(n) != 1})
+        extra_codes = {name: EXTRA_NAME_BASE + i for i, name in enumerate(extra_names)}
+
+        def code(name):
+            return ord(name) if len(name) == 1 else extra_codes[name]
+
+        rows = sorted((code(k), k) for k in mapping)
+        heads = array("I", (c for c, _ in rows))
+        offsets = array("I", [0])
+        comps = array("I")
+        for _, k in rows:
+            comps.extend(code(p) for p in mapping[k])
+            offsets.append(len(comps))
+        return cls(heads, offsets, comps, extra_names)
+
+    @classmethod
+    def from_index(cls, index):
+        """mmap した IDS 索引の配列をコピーせずにそのまま使う"""
+        return cls(*index.arrays())
+
+    # ==========================================
+    # 名前 <-> ノード番号
+    # ==========================================
+    def code(self, name):
+        if len(name) == 1:
+            return ord(name)
+        return self._extra_codes.get(name, -1)
+
+    def name(self, code):
+        if code >= EXTRA_NAME_BASE:
+            return self.extra_names[code - EXTRA_NAME_BASE]
+        return chr(code)
+
+    def row(self, code):
+        """見出しの行番号（見出しでなければ -1）"""
+        i = bisect_left(self.heads, code)
+        if i < len(self.heads) and self.heads[i] == code:
+            return i
+        return -1
+
+    # ==========================================
+    # Mapping（dict 互換）
+    # ==========================================
+    def __getitem__(self, name):
+        i = self.row(self.code(name)) if isinstance(name, str) else -1
+        if i < 0:
+            raise KeyError(name)
+        return [self.name(c) for c in self.comps[self.offsets[i]:self.offsets[i + 1]]]
+
+    def __contains__(self, name):
+        return isinstance(name, str) and self.row(self.code(name)) >= 0
+
+    def __iter__(self):
+        return (self.name(c) for c in self.heads)
+
+    def __len__(self):
+        return len(self.heads)
+
+    # ==========================================
+    # 逆引き（構成要素 -> それを使っている文字）
+    # ==========================================
+    def _build_reverse(self):
+        """(構成要素, 見出し) の組を構成要素順に数え分けて逆向きの CSR を作る"""
+        rev_keys = array("I", sorted(set(self.comps)))
+        counts = array("I", bytes(4 * (len(rev_keys) + 1)))
+        slots = array("I", bytes(4 * len(self.comps)))
+        for j, c in enumerate(self.comps):
+            slots[j] = bisect_left(rev_keys, c)
+            counts[slots[j] + 1] += 1
+        for i in range(len(rev_keys)):
+            counts[i + 1] += counts[i]
+
+        rev_offsets = array("I", counts)
+        parents = array("I", bytes(4 * len(self.comps)))
+        fill = array("I", counts)
+        for i in range(len(self.heads)):
+            for j in range(self.offsets[i], self.offsets[i + 1]):
+                parents[fill[slots[j]]] = self.heads[i]
+                fill[slots[j]] += 1
+        self._reverse = (rev_keys, rev_offsets, parents)
+
+    def parent_codes(self, code):
+        if self._reverse is None:
+            self._build_reverse()
+        rev_keys, rev_offsets, parents = self._reverse
+        i = bisect_left(rev_keys, code)
+        if i == len(rev_keys) or rev_keys[i] != code:
+            return parents[0:0]
+        return parents[rev_offsets[i]:rev_offsets[i + 1]]
+
+    def parents(self, name):
+        """name を構成要素に持つ見出し（重複なし、ノード番号順）"""
+        codes = self.parent_codes(self.code(name))
+        return [self.name(c) for i, c in enumerate(codes) if i == 0 or codes[i - 1] != c]
+
+    # ==========================================
+    # 行単位の処理（依存順）
+    # ==========================================
+    def comp_rows(self):
+        """comps と同じ並びで、構成要素の行番号（見出しでなければ -1）"""
+        if self._comp_rows is None:
+            self._comp_rows = array("i", (self.row(c) for c in self.comps))
+        return self._comp_rows
+
+    def sccs(self, stop=frozenset()):
+        """
+        行番号の強連結成分を依存先が先に来る順で返す（Tarjan法・非再帰）
+        stop の行（原子パーツなど）からは辿らない
+        recipe_graph.strongly_connected_components と同じ順序になるよう、子も comps の並び順に辿る
+        """
+        n = len(self.heads)
+        comp_rows = self.comp_rows()
+        offsets = self.offsets
+        index = array("i", [-1]) * n
+        low = array("i", [0]) * n
+        on_stack = bytearray(n)
+        stack = []
+        counter = 0
+
+        for root in range(n):
+            if index[root] >= 0: continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            work = [[root, offsets[root] if root not in stop else offsets[root + 1]]]
+
+            while work:
+                frame = work[-1]
+                node = frame[0]
+                end = offsets[node + 1]
+                descended = False
+                while frame[1] < end:
+                    child = comp_rows[frame[1]]
+                    frame[1] += 1
+                    if child < 0: continue
+                    if index[child] < 0:
+                        index[child] = low[child] = counter
+                        counter += 1
+                        stack.append(child)
+                        on_stack[child] = 1
+                        work.append([child, offsets[child] if child not in stop else offsets[child + 1]])
+                        descended = True
+                        break
+                    if on_stack[child] and index[child] < low[node]:
+                        low[node] = index[child]
+                if descended:
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if low[node] < low[parent]:
+                        low[parent] = low[node]
+
+                if low[node] == index[node]:
+                    scc = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = 0
+                        scc.append(w)
+                        if w == node: break
+                    yield scc
+
+    def atomic_costs(self):
+        """
+        generate_problems.build_atomic_cost_table と同じ「必要な原子パーツ数」を行ごとの配列で返す
+        循環しているレシピ同士・見出しでない構成要素はコスト1
+        """
+        comp_rows = self.comp_rows()
+        costs = array("I", bytes(4 * len(self.heads)))
+        for scc in self.sccs():
+            members = set(scc) if len(scc) > 1 else ()
+            for i in scc:
+                total = 0
+                for j in range(self.offsets[i], self.offsets[i + 1]):
+                    child = comp_rows[j]
+                    total += 1 if child < 0 or child == i or child in members else costs[child]
+                costs[i] = total
+        return costs
+
+    def reachable(self, atomic_parts):
+        """
+        validate_all.compute_reachability と同じ判定（原子パーツまで辿れるか）を行ごとの配列で返す
+        原子パーツの行は 1、循環しているレシピ同士・レシピのない構成要素を含む行は 0
+        """
+        atomic_codes = {self.code(p) for p in atomic_parts}
+        stop = {i for i, c in enumerate(self.heads) if c in atomic_codes}
+        comp_rows = self.comp_rows()
+        ok = bytearray(len(self.heads))
+        for scc in self.sccs(stop):
+            members = set(scc) if len(scc) > 1 else ()
+            for i in scc:
+                if i in stop:
+                    ok[i] = 1
+                    continue
+                ok[i] = all(
+                    self.comps[j] in atomic_codes
+                    or (comp_rows[j] >= 0 and comp_rows[j] not in members and ok[comp_rows[j]])
+                    for j in range(self.offsets[i], self.offsets[i + 1])
+                )
+        return ok
+
+    def as_dict(self, values):
+        """行ごとの配列を 文字 -> 値 の dict にする（既存ツールとの突き合わせ用）"""
+        return {self.name(c): values[i] for i, c in enumerate(self.heads)}
+
+    def nbytes(self):
+        """配列が使っているバイト数（逆引きは作成済みの場合のみ）"""
+        buffers = [self.heads, self.offsets, self.comps]
+        if self._reverse is not None:
+            buffers.extend(self._reverse)
+        if self._comp_rows is not None:
+            buffers.append(self._comp_rows)
+        return sum(len(b) * b.itemsize for b in buffers)
+
+def load_ids_graph(source_path):
+    """ids.txt を CSR グラフとして読む（索引が新しければ mmap の配列をそのまま使う）"""
+    ids_db, stats = load_ids_db(source_path)
+    if isinstance(ids_db, IdsIndex):
+        return CsrGraph.from_index(ids_db), stats
+    return CsrGraph.from_mapping(ids_db), stats
+
+def main():
+    from generate_dictionary import INPUT_IDS_FILE
+    from ids_index import format_stats, parse_ids_file
+
+    graph, stats = load_ids_graph(INPUT_IDS_FILE)
+    if stats:
+        print(format_stats(stats))
+    graph.parent_codes(0)
+    graph.comp_rows()
+    print(f"🕸 CSR グラフ: {len(graph):,} 文字 / 構成要素 {len(graph.comps):,} 個 / {graph.nbytes() / 1024:.0f}KB（逆引き込み）")
+
+    ids_db = parse_ids_file(INPUT_IDS_FILE)
+    dict_bytes = sys.getsizeof(ids_db) + sum(
+        sys.getsizeof(k) + sys.getsizeof(v) + sum(sys.getsizeof(c) for c in v) for k, v in ids_db.items()
+    )
+    print(f"📦 dict 版（parse_ids_file）: 約 {dict_bytes / 1024:.0f}KB（{dict_bytes / graph.nbytes():.1f} 倍）")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+
+# ==========================================
+# 設定
+# ==========================================
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(CURRENT_DIR, ".cache")
+INDEX_FILE = os.path.join(CACHE_DIR, "ids-index.bin")
+
+IDC_CHARS = "⿰⿱⿲⿳⿴⿵⿶⿷⿸⿹⿺⿻"
+
+# ファイル構成（すべてリトルエンディアン）
+#   ヘッダー: マジック, バージョン, 元ファイルのサイズ/mtime/SHA-256, フルパース時間(ms), 文字数, 構成要素の総数
+#   keys[n]       : 見出し文字のコードポイント（昇順）
+#   offsets[n + 1]: comps 内の開始位置
+#   comps[total]  : 構成要素のコードポイントを連結したもの
+INDEX_MAGIC = b"IDSX"
+INDEX_VERSION = 1
+HEADER_FORMAT = "<4sIQQ32sdII"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+def parse_ids_file(filepath):
+    """IDSファイルを全読み込み"""
+    ids_db = {}
+    try:
+        with open(filepath, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(";;"): continue
+                parts = line.strip().split("\t")
+                if len(parts) < 3: continue
+
+                kanji = parts[1]
+                structure = parts[2]
+                components = [c for c in structure if c not in IDC_CHARS and c != kanji]
+                ids_db[kanji] = components
+    except FileNotFoundError:
+        print("❌ ids.txt がありません")
+        return {}
+    return ids_db
+
+def file_sha256(filepath):
+    h = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.digest()
+
+def _u32_array(values):
+    arr = array("I", values)
+    if sys.byteorder != "little":
+        arr.byteswap()
+    return arr
+
+def build_index(source_path, index_path=INDEX_FILE):
+    """ids.txt をフルパースして索引ファイルを書き出す。パース結果の辞書も返す"""
+    start = time.perf_counter()
+    ids_db = parse_ids_file(source_path)
+    parse_ms = (time.perf_counter() - start) * 1000
+
+    keys = sorted(ord(k) for k in ids_db)
+    offsets = [0]
+    comps = []
+    for cp in keys:
+        comps.extend(ord(c) for c in ids_db[chr(cp)])
+        offsets.append(len(comps))
+
+    st = os.stat(source_path)
+    header = struct.pack(
+        HEADER_FORMAT, INDEX_MAGIC, INDEX_VERSION,
+        st.st_size, st.st_mtime_ns, file_sha256(source_path),
+        parse_ms, len(keys), len(comps)
+    )
+
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    tmp_path = index_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        _u32_array(keys).tofile(f)
+        _u32_array(offsets).tofile(f)
+        _u32_array(comps).tofile(f)
+    os.replace(tmp_path, index_path)
+
+    return ids_db, parse_ms
+
+class IdsIndex(Mapping):
+    """
+    索引ファイルを mmap した読み取り専用の IDS 辞書
+    parse_ids_file() の戻り値と同じく 文字 -> 構成要素リスト として使える
+    （中身は参照されたときに初めてデコードする）
+    """
+    def __init__(self, index_path):
+        self._file = open(index_path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        (_, _, self.source_size, self.source_mtime_ns, self.source_sha256,
+         self.parse_ms, n, total) = struct.unpack_from(HEADER_FORMAT, self._mm, 0)
+
+        body = memoryview(self._mm)[HEADER_SIZE:HEADER_SIZE + (2 * n + 1 + total) * 4]
+        if sys.byteorder == "little":
+            words = body.cast("I")
+        else:
+            words = array("I", body.tobytes())
+            words.byteswap()
+        self._keys = words[:n]
+        self._offsets = words[n:2 * n + 1]
+        self._comps = words[2 * n + 1:]
+
+    def _find(self, char):
+        if len(char) != 1:
+            return -1
+        cp = ord(char)
+        i = bisect_left(self._keys, cp)
+        if i < len(self._keys) and self._keys[i] == cp:
+            return i
+        return -1
+
+    def __getitem__(self, char):
+        i = self._find(char)
+        if i < 0:
+            raise KeyError(char)
+        return [chr(c) for c in self._comps[self._offsets[i]:self._offsets[i + 1]]]
+
+    def __contains__(self, char):
+        return isinstance(char, str) and self._find(char) >= 0
+
+    def __iter__(self):
+        return (chr(cp) for cp in self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def arrays(self):
+        """CSR の配列（keys, offsets, comps）をそのまま返す（ids_graph.CsrGraph 用）"""
+        return self._keys, self._offsets, self._comps
+
+def read_header(index_path):
+    try:
+        with open(index_path, "rb") as f:
+            data = f.read(HEADER_SIZE)
+    except FileNotFoundError:
+        return None
+    if len(data) < HEADER_SIZE:
+        return None
+    header = struct.unpack(HEADER_FORMAT, data)
+    if header[0] != INDEX_MAGIC or header[1] != INDEX_VERSION:
+        return None
+    return header
+
+def is_index_fresh(source_path, index_path=INDEX_FILE):
+    """サイズ + mtime が一致すれば有効。mtime だけ違う場合は内容のハッシュで判定する"""
+    header = read_header(index_path)
+    if header is None:
+        return False
+    _, _, size, mtime_ns, sha256, _, _, _ = header
+
+    st = os.stat(source_path)
+    if st.st_size != size:
+        return False
+    if st.st_mtime_ns == mtime_ns:
+        return True
+    if file_sha256(source_path) != sha256:
+        return False
+
+    # 内容は同じ（git checkout などで mtime だけ変わった）→ 次回からは mtime で判定できるよう更新
+    with open(index_path, "r+b") as f:
+        f.seek(struct.calcsize("<4sIQ"))
+        f.write(struct.pack("<Q", st.st_mtime_ns))
+    return True
+
+def load_ids_db(source_path, index_path=INDEX_FILE, rebuild=False):
+    """
+    索引が新しければ mmap で読み込み、古ければ ids.txt をパースして作り直す
+    戻り値: (ids_db, stats)
+    ※ stats の open_ms は mmap で開くまでの時間だけ（各文字のデコードは参照時に行うので含まない）
+    """
+    if not os.path.exists(source_path):
+        print("❌ ids.txt がありません")
+        return {}, None
+
+    if not rebuild and is_index_fresh(source_path, index_path):
+        start = time.perf_counter()
+        ids_db = IdsIndex(index_path)
+        open_ms = (time.perf_counter() - start) * 1000
+        return ids_db, {"rebuilt": False, "open_ms": open_ms, "parse_ms": ids_db.parse_ms}
+
+    ids_db, parse_ms = build_index(source_path, index_path)
+    return ids_db, {"rebuilt": True, "open_ms": parse_ms, "parse_ms": parse_ms}
+
+def format_stats(stats):
+    if stats["rebuilt"]:
+        return f"🛠 IDS索引を再構築しました: フルパース {stats['parse_ms']:.1f}ms"
+    # 全文字を引くとフルパースと同程度かかるので、倍率は出さない（速くなるのは参照した文字の分だけで済むため）
+    return (f"⚡ IDS索引を開きました: {stats['open_ms']:.2f}ms"
+            f"（mmap のみ。各文字は参照時にデコード / フルパースは {stats['parse_ms']:.1f}ms）")
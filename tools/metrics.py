@@ -0,0 +1,52 @@
+import json
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+class Metrics:
+    """
+    --metrics 用の計測（ステージごとの所要時間・カウンター・ヒストグラム）
+    無効のときは stage() も count() も何もしないので、通常実行への影響はほぼない
+    """
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.stages_ms = {}
+        self.counters = Counter()
+        self.histograms = {}
+
+    @contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages_ms[name] = round((time.perf_counter() - start) * 1000, 3)
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] += n
+
+    def observe(self, histogram, value):
+        if self.enabled:
+            self.histograms.setdefault(histogram, Counter())[value] += 1
+
+    def to_dict(self):
+        return {
+            "stages_ms": self.stages_ms,
+            "total_ms": round(sum(self.stages_ms.values()), 3),
+            "counters": dict(sorted(self.counters.items())),
+            "histograms": {
+                name: {str(k): v for k, v in sorted(h.items())}
+                for name, h in self.histograms.items()
+            },
+        }
+
+    def write(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        print(f"📊 計測結果を書き出しました: {path}")
@@ -0,0 +1,170 @@
+import argparse
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from generate_problems import (
+    INPUT_FILES, build_atomic_cost_table, build_merge_plans, calculate_difficulty,
+    jukugo_merge_plan, load_atomic_parts, load_ids_map,
+)
+from source_reader import iter_source_lines
+from validate_all import compute_reachability
+
+# ==========================================
+# 設定
+# ==========================================
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_OUTPUT = os.path.join(CURRENT_DIR, "jukugo_source_mined.txt")
+
+# 1プロセスに渡す行数と、同時に処理中にしておくバッチ数（ワーカー数あたり）
+BATCH_SIZE = 5000
+IN_FLIGHT_PER_JOB = 2
+# 盤面は16マスなので、原子パーツがそれより多い熟語は出題できない
+MAX_BOARD_PARTS = 16
+
+def build_composable_set(ids_map, atomic_parts):
+    """合体で作れる文字（原子パーツ + 原子パーツまで辿れるレシピを持つ文字）"""
+    reachability = compute_reachability(ids_map, atomic_parts)
+    return frozenset(atomic_parts) | frozenset(c for c, (ok, _) in reachability.items() if ok)
+
+def iter_words(filepath):
+    """
+    単語リストを1行ずつ読む（1列目が単語、2列目があれば読み。区切りはタブかカンマ）
+    戻り値: (単語, 読み) のジェネレーター
+    """
+    with open(filepath, "r", encoding="utf-8-sig") as f:
+        for raw in f:
+            line = raw.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = re.split(r"[\t,]", line)
+            yield fields[0].strip(), fields[1].strip() if len(fields) > 1 else ""
+
+def iter_batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+# ==========================================
+# 判定（ワーカー側）
+# ==========================================
+_worker_tables = None
+
+def _init_worker(composable, atomic_costs, merge_plans):
+    global _worker_tables
+    _worker_tables = (composable, atomic_costs, merge_plans)
+
+def _mine_batch(batch):
+    """全文字が作れる単語だけを (単語, 読み, 難易度, 原子パーツ数) で返す"""
+    composable, atomic_costs, merge_plans = _worker_tables
+    found = []
+    for word, reading in batch:
+        if len(word) < 2 or not composable.issuperset(word):
+            continue
+        kanji_list = list(word)
+        atoms, _ = jukugo_merge_plan(kanji_list, merge_plans)
+        atom_count = sum(len(a.split(" ")) for a in atoms)
+        if atom_count > MAX_BOARD_PARTS:
+            continue
+        found.append((word, reading, calculate_difficulty(kanji_list, atomic_costs), atom_count))
+    return found
+
+def mine(words, tables, jobs=1):
+    """
+    単語を流しながら判定する（結果は入力順）
+    並列時も処理中のバッチ数を抑えるので、単語リストを丸ごとメモリに載せない
+    """
+    batches = iter_batches(words, BATCH_SIZE)
+    if jobs <= 1:
+        _init_worker(*tables)
+        for batch in batches:
+            yield from _mine_batch(batch)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=tables) as executor:
+        pending = deque()
+        for batch in batches:
+            pending.append(executor.submit(_mine_batch, batch))
+            if len(pending) >= jobs * IN_FLIGHT_PER_JOB:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+# ==========================================
+# 出力
+# ==========================================
+def load_existing_jukugo():
+    """既存ソースに載っている熟語（重複して出力しないように）"""
+    existing = set()
+    for filename in INPUT_FILES:
+        filepath = os.path.join(CURRENT_DIR, filename)
+        if os.path.exists(filepath):
+            existing.update(fields[0].strip() for _, _, fields in iter_source_lines(filepath))
+    return existing
+
+def write_source_lines(results, output_path):
+    """
+    jukugo_source.txt と同じ形式（熟語,よみ,意味,例文）で書き出す
+    難易度・原子パーツ数ごとに見出しコメントを付けるので、そのまま貼り付けられる
+    """
+    groups = {}
+    for word, reading, difficulty, atom_count in results:
+        groups.setdefault((difficulty, atom_count), []).append((word, reading))
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("# mine_jukugo.py で抽出した熟語（読み・意味・例文は要確認）\n")
+        for (difficulty, atom_count), words in sorted(groups.items()):
+            f.write(f"\n# --- 難易度 {difficulty} / 原子パーツ {atom_count} 個 ---\n")
+            for word, reading in words:
+                f.write(f"{word},{reading or '???'},,\n")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="単語リストから、全文字が合体で作れる熟語を抽出する")
+    parser.add_argument("wordlist", help="単語リスト（1行1語。タブかカンマ区切りで2列目に読みがあれば使う）")
+    parser.add_argument("-o", "--output", default=DEFAULT_OUTPUT, help="出力先（ソースと同じ形式）")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="並列実行するプロセス数")
+    parser.add_argument("--include-existing", action="store_true", help="既存ソースにある熟語も出力する")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if not os.path.exists(args.wordlist):
+        print(f"❌ ファイルが見つかりません: {args.wordlist}")
+        return
+
+    ids_map = load_ids_map()
+    if not ids_map: return
+    atomic_parts = load_atomic_parts()
+
+    atomic_costs, _ = build_atomic_cost_table(ids_map)
+    tables = (build_composable_set(ids_map, atomic_parts), atomic_costs, build_merge_plans(ids_map, atomic_parts))
+    print(f"🧱 作れる文字: {len(tables[0])} 文字")
+
+    skip = set() if args.include_existing else load_existing_jukugo()
+    results = []
+    scanned = 0
+
+    def counted(words):
+        nonlocal scanned
+        for item in words:
+            scanned += 1
+            yield item
+
+    print(f"⛏️ 抽出中: {os.path.basename(args.wordlist)}")
+    for result in mine(counted(iter_words(args.wordlist)), tables, args.jobs):
+        if result[0] in skip:
+            continue
+        skip.add(result[0])
+        results.append(result)
+
+    write_source_lines(results, args.output)
+    print(f"✅ {scanned:,} 語中 {len(results):,} 語を抽出しました: {args.output}")
+
+if __name__ == "__main__":
+    main()
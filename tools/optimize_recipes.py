@@ -0,0 +1,293 @@
+import argparse
+import json
+import os
+from collections import Counter
+
+from format_json import format_overrides_compact, write_config
+from generate_dictionary import (
+    CONFIG_FILE, INPUT_IDS_FILE, OUTPUT_JSON_FILE, IntermediatePool, build_merge_index, decompose_targets,
+    load_config, load_joyo_kanji, merge_key, plan_merge_trees,
+)
+from ids_index import load_ids_db
+
+# ==========================================
+# 設定
+# ==========================================
+# 共有の見直しを繰り返す最大回数（前回より中間パーツが減らなくなったら打ち切る）
+MAX_ROUNDS = 5
+
+def seq_key(seq):
+    """中間パーツの同一視キー（2パーツの合体は順不同なので並びを揃える）"""
+    if len(seq) == 2:
+        return tuple(merge_key(*seq).split("+"))
+    return seq
+
+class RecipeSearch:
+    """
+    パーツ列を2つずつ合体させる組み方（並び順を保った2分木）をメモ化して探索する
+    既存の文字で作れる部分列はコスト0、新しい中間パーツは重み（共有されるほど軽い）を足す
+    部分列ごとの結果は全漢字で共有する（同じ部分列は1回しか探索しない）
+    """
+    def __init__(self, known_pairs, known_parts, usage, shared=frozenset()):
+        self.known_pairs = known_pairs # ペア -> 既存の文字（2パーツのレシピ）
+        self.known_parts = known_parts # パーツ列 -> 既存の漢字（同じ分解を持つ漢字）
+        self.usage = usage
+        self.shared = shared # 前回の計画で作ることになった中間パーツ
+        self.memo = {}
+
+    def weight(self, seq):
+        key = seq_key(seq)
+        if key in self.shared:
+            return 0.0
+        return 1 / self.usage[key]
+
+    def options(self, seq):
+        """
+        部分列 seq を1つの文字にする方法
+        戻り値: (作れる既存の文字のリスト, 新しい中間パーツにした場合のコスト, 分ける位置)
+        """
+        if seq in self.memo:
+            return self.memo[seq]
+        if len(seq) == 1:
+            result = ([seq[0]], 0.0, None)
+        else:
+            existing = [self.known_parts[seq]] if seq in self.known_parts else []
+            for char in self.existing_pairs(seq):
+                if char not in existing:
+                    existing.append(char)
+            cost, k = self.best_split(seq)
+            result = (existing, cost + self.weight(seq), k)
+        self.memo[seq] = result
+        return result
+
+    def cost(self, seq):
+        existing, cost, _ = self.options(seq)
+        return 0.0 if existing else cost
+
+    def existing_pairs(self, seq):
+        """左右を既存の文字で作り、その2つが既存レシピで合体できる場合の結果"""
+        found = []
+        for k in range(len(seq) - 1, 0, -1):
+            for left in self.options(seq[:k])[0]:
+                for right in self.options(seq[k:])[0]:
+                    char = self.known_pairs.get(merge_key(left, right))
+                    if char and char not in found:
+                        found.append(char)
+        return found
+
+    def best_split(self, seq):
+        """
+        左右に分ける位置ごとに、左右それぞれ最安の作り方を足して比べる
+        同点なら先に見つかった分け方（左から順に組む形）を採用
+        戻り値: (コスト, 分ける位置)
+        """
+        best = None
+        for k in range(len(seq) - 1, 0, -1):
+            cost = self.cost(seq[:k]) + self.cost(seq[k:])
+            if best is None or cost < best[0]:
+                best = (cost, k)
+        return best
+
+    def build(self, seq):
+        """部分列の作り方を木にする（既存の文字で作れるならその文字）"""
+        existing, _, k = self.options(seq)
+        if existing:
+            return existing[0]
+        return (self.build(seq[:k]), self.build(seq[k:]))
+
+    def plan(self, parts):
+        """漢字1文字の組み方（根は漢字そのものなので重みは足さない）"""
+        seq = tuple(parts)
+        _, k = self.best_split(seq)
+        return (self.build(seq[:k]), self.build(seq[k:]))
+
+    def fresh_nodes(self, parts):
+        """plan() の組み方で新しく作る中間パーツ（部分列のキー）"""
+        seq = tuple(parts)
+        _, k = self.best_split(seq)
+        nodes = []
+        stack = [seq[:k], seq[k:]]
+        while stack:
+            side = stack.pop()
+            existing, _, k = self.options(side)
+            if not existing:
+                nodes.append(seq_key(side))
+                stack.extend([side[:k], side[k:]])
+        return nodes
+
+def count_usage(multi_part):
+    """部分列ごとに、それを含む漢字の数（中間パーツを共有できる相手の数）"""
+    usage = Counter()
+    for parts in multi_part.values():
+        seqs = set()
+        for i in range(len(parts)):
+            for j in range(i + 2, len(parts) + 1):
+                if j - i < len(parts):
+                    seqs.add(seq_key(tuple(parts[i:j])))
+        usage.update(seqs)
+    return usage
+
+def build_known(dictionary, multi_part):
+    """既存の文字として使えるもの: 2パーツのレシピと、同じ分解を持つ3パーツ以上の漢字"""
+    known_pairs = {}
+    for name, parts in dictionary.items():
+        if len(parts) == 2:
+            known_pairs.setdefault(merge_key(*parts), name)
+    known_parts = {}
+    for kanji, parts in multi_part.items():
+        known_parts.setdefault(tuple(parts), kanji)
+    return known_pairs, known_parts
+
+def materialize(plans, dictionary, multi_part):
+    """組み方を実際のレシピにする。戻り値: (漢字 -> [左, 右], 作った中間パーツ -> [左, 右])"""
+    scratch = dict(dictionary)
+    pool = IntermediatePool(scratch)
+    for name, parts in dictionary.items():
+        pool.register(name, parts)
+    for kanji, parts in multi_part.items():
+        pool.register_parts(kanji, parts)
+    recipes = {}
+    for kanji, (left, right) in plans.items():
+        recipes[kanji] = [pool.intern(left), pool.intern(right)]
+        pool.register(kanji, recipes[kanji])
+    return recipes, {name: scratch[name] for name in pool.created}
+
+def optimize(multi_part, dictionary):
+    """
+    全体で新しい中間パーツが最少になる組み方を探す
+    1回目は「共有できる漢字の数」で重み付けし、2回目以降は前回作ることになった中間パーツを
+    コスト0として探し直す（減らなくなるまで）
+    """
+    usage = count_usage(multi_part)
+    known_pairs, known_parts = build_known(dictionary, multi_part)
+
+    best = None
+    shared = frozenset()
+    for _ in range(MAX_ROUNDS):
+        search = RecipeSearch(known_pairs, known_parts, usage, shared)
+        plans = {kanji: search.plan(parts) for kanji, parts in multi_part.items()}
+        recipes, created = materialize(plans, dictionary, multi_part)
+        if best is not None and len(created) >= len(best[1]):
+            break
+        best = (recipes, created)
+        shared = frozenset(node for parts in multi_part.values() for node in search.fresh_nodes(parts))
+    return best
+
+def expand(parts, table):
+    """中間パーツ（&...）を展開した木（ID の付け方によらず組み方を比べるため）"""
+    return tuple(
+        expand(table[p], table) if p.startswith("&") and p in table else p
+        for p in parts
+    )
+
+def collect_multi_part(ids_map, decompositions):
+    """3パーツ以上の漢字（分解結果と、ids-map に残っているもの）"""
+    multi_part = {k: p for k, p in decompositions.items() if p and len(p) >= 3}
+    for kanji, parts in ids_map.items():
+        if not kanji.startswith("&") and len(parts) >= 3:
+            multi_part[kanji] = parts
+    return multi_part
+
+def baseline_count(multi_part, dictionary):
+    """generate_dictionary.py と同じ方法（共有優先の全探索）で作った場合の中間パーツ数"""
+    pool = IntermediatePool(dict(dictionary))
+    for name, parts in dictionary.items():
+        pool.register(name, parts)
+    plan_merge_trees(multi_part, pool)
+    return len(pool.created)
+
+def with_intermediates(proposals, recipes, created):
+    """漢字のレシピの案に、それが使う中間パーツを足す"""
+    result = {k: recipes[k] for k in proposals}
+    pending = [p for recipe in result.values() for p in recipe]
+    while pending:
+        part = pending.pop()
+        if part in created and part not in result:
+            result[part] = created[part]
+            pending.extend(created[part])
+    return result
+
+def drop_colliding(kanji_list, recipes, created, ids_map):
+    """
+    現在の ids-map に案を重ねたとき、新しく同じペアになる漢字（陪 = 阝 + &倍_右 と 部 など）を案から外す
+    戻り値: (残った漢字, 外した漢字)
+    """
+    before = build_merge_index(ids_map)[1]
+    kept, dropped = list(kanji_list), []
+    while kept:
+        ambiguous = build_merge_index({**ids_map, **with_intermediates(kept, recipes, created)})[1]
+        bad = {t for key, targets in ambiguous.items() if key not in before for t in targets if t in kept}
+        if not bad:
+            break
+        kept = [k for k in kept if k not in bad]
+        dropped.extend(sorted(bad))
+    return kept, dropped
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="3パーツ以上の漢字の2パーツずつの組み方を探し、manual_overrides の案を出す")
+    parser.add_argument("-o", "--output", metavar="PATH", help="提案を JSON で書き出す")
+    parser.add_argument("--apply", action="store_true", help="提案を dictionary_config.json の manual_overrides に書き込む")
+    parser.add_argument("--all", action="store_true", help="現在の ids-map と同じレシピも含めてすべて出力する")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    atomic_parts, manual_overrides = load_config()
+    allowed_set = load_joyo_kanji(atomic_parts)
+    ids_db, _ = load_ids_db(INPUT_IDS_FILE)
+
+    ids_map = {}
+    if os.path.exists(OUTPUT_JSON_FILE):
+        with open(OUTPUT_JSON_FILE, "r", encoding="utf-8") as f:
+            ids_map = json.load(f)
+
+    # generate_dictionary.py と同じ対象・同じ分解（2パーツのものは既存レシピとして使う）
+    targets = [k for k in sorted(allowed_set) if k not in manual_overrides and k not in atomic_parts]
+    print("🧩 分解中...")
+    decompositions, _ = decompose_targets(targets, ids_db, allowed_set, atomic_parts)
+    dictionary = dict(manual_overrides)
+    for kanji in targets:
+        if decompositions[kanji] and len(decompositions[kanji]) == 2:
+            dictionary[kanji] = decompositions[kanji]
+    multi_part = collect_multi_part(ids_map, decompositions)
+    print(f"🔍 3パーツ以上の漢字: {len(multi_part)} 個")
+    if not multi_part:
+        print("✅ 組み方を探す漢字はありません。")
+        return
+
+    recipes, created = optimize(multi_part, dictionary)
+    naive = sum(len(p) - 2 for p in multi_part.values())
+    print(f"♻️ 新しい中間パーツ: {len(created)} 個（左から順に組む場合 {naive} 個 / 現在の生成方式 {baseline_count(multi_part, dictionary)} 個）")
+
+    changed = []
+    for kanji, recipe in recipes.items():
+        current = ids_map.get(kanji)
+        if args.all or not current or expand(current, ids_map) != expand(recipe, {**dictionary, **created}):
+            changed.append(kanji)
+    changed, dropped = drop_colliding(changed, recipes, created, ids_map)
+    if dropped:
+        print(f"⚠️ 既存の文字と同じペアになるため案から外した漢字: {' '.join(dropped)}")
+    # 提案したレシピが使う中間パーツも一緒に登録する
+    proposals = with_intermediates(changed, recipes, created)
+
+    if not proposals:
+        print("✅ 現在の ids-map より良い組み方は見つかりませんでした。")
+        return
+
+    print(f"📝 manual_overrides の案: {len(proposals)} 件")
+    print(f'  "manual_overrides": {format_overrides_compact(proposals, indent=4)}')
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(proposals, f, ensure_ascii=False, indent=2)
+        print(f"✅ 保存完了: {args.output}")
+
+    if args.apply:
+        with open(CONFIG_FILE, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        config["manual_overrides"].update(proposals)
+        write_config(config)
+        print(f"✅ {CONFIG_FILE} に書き込みました（generate_dictionary.py を再実行してください）")
+
+if __name__ == "__main__":
+    main()
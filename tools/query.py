@@ -0,0 +1,116 @@
+import argparse
+import json
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+from dictionary_daemon import DEFAULT_PORT, HOST
+
+# ==========================================
+# 設定
+# ==========================================
+TIMEOUT_SEC = 10
+
+def request(port, name, **params):
+    url = f"http://{HOST}:{port}/{name}"
+    if params:
+        url += "?" + urlencode(params)
+    try:
+        with urlopen(url, timeout=TIMEOUT_SEC) as res:
+            return json.load(res)
+    except HTTPError as e:
+        return json.load(e)
+
+def print_decompose(result):
+    char = result["char"]
+    if result["atomic"]:
+        print(f"🧱 {char}: 原子パーツ（これ以上分解しません）")
+    elif result["decomposition"] is None:
+        print(f"❌ {char}: 知っている文字だけでは分解できません")
+    else:
+        label = "手動設定" if result["override"] else "自動分解"
+        print(f"🧩 {char}: {' + '.join(result['decomposition'])}（{label}）")
+    if result["recipe"]:
+        print(f"   ids-map: {' + '.join(result['recipe'])}")
+
+def print_parents(result):
+    parents = result["parents"]
+    print(f"🔎 {result['char']} を使っている文字: {len(parents)} 個")
+    if parents:
+        print(f"   {''.join(parents)}")
+
+def print_merge(result):
+    if result["result"]:
+        print(f"✨ {result['pair']} = {result['result']}")
+    else:
+        print(f"🚫 {result['pair']} は合体できません")
+
+def print_reachability(result):
+    if result["ok"]:
+        print(f"✅ {result['char']} : 作成可能")
+    else:
+        print(f"❌ {result['char']} : {result['reason']}")
+
+def print_difficulty(result):
+    print(f"📊 {result['jukugo']}: 難易度 {result['difficulty']}")
+    print(f"   原子パーツ: {' / '.join(result['atoms'])}")
+    for step in result["plan"]:
+        print(f"   {step}")
+
+def print_status(result):
+    for name, info in result["files"].items():
+        print(f"📄 {name}: 読込 {info['reloads']} 回（{info['path']}）")
+    print(f"🧮 作成済みの派生データ: {', '.join(result['derived']) or 'なし'}")
+
+PRINTERS = {
+    "decompose": print_decompose,
+    "parents": print_parents,
+    "merge": print_merge,
+    "reachability": print_reachability,
+    "difficulty": print_difficulty,
+    "status": print_status,
+}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="dictionary_daemon.py に問い合わせる")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--json", action="store_true", help="結果を JSON のまま表示する")
+    sub = parser.add_subparsers(dest="query", required=True)
+    sub.add_parser("decompose", help="文字の分解結果").add_argument("char")
+    sub.add_parser("parents", help="ids.txt 上でその文字を構成要素に持つ文字").add_argument("char")
+    merge = sub.add_parser("merge", help="2つの部品の合体結果")
+    merge.add_argument("a")
+    merge.add_argument("b")
+    sub.add_parser("reachability", help="原子パーツから作れるか").add_argument("chars", nargs="+")
+    sub.add_parser("difficulty", help="熟語の難易度と合体手順").add_argument("jukugo", nargs="+")
+    sub.add_parser("status", help="読み込んでいるファイルの状態")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.query == "reachability":
+        calls = [{"char": c} for c in args.chars]
+    elif args.query == "difficulty":
+        calls = [{"jukugo": j} for j in args.jukugo]
+    elif args.query in ("decompose", "parents"):
+        calls = [{"char": args.char}]
+    elif args.query == "merge":
+        calls = [{"a": args.a, "b": args.b}]
+    else:
+        calls = [{}]
+
+    for params in calls:
+        try:
+            result = request(args.port, args.query, **params)
+        except URLError:
+            print(f"❌ デーモンに接続できません。先に python dictionary_daemon.py --port {args.port} で起動してください。")
+            return
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+        elif "error" in result:
+            print(f"❌ {result['error']}")
+        else:
+            PRINTERS[args.query](result)
+
+if __name__ == "__main__":
+    main()
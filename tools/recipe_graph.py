@@ -0,0 +1,72 @@
+# レシピ（分解）グラフ用の汎用ヘルパー
+# 検証・難易度計算など、文字 -> 構成要素 のグラフを依存順に処理するツールで共有する
+
+def strongly_connected_components(nodes, children):
+    """
+    Tarjan法（非再帰）で強連結成分を列挙する
+    依存先が先に来る順（トポロジカル順の逆）で返すので、そのまま順に確定させていける
+    """
+    index = {}
+    low = {}
+    counter = 0
+    stack = []
+    on_stack = set()
+    result = []
+
+    for root in nodes:
+        if root in index: continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(children(root)))]
+
+        while work:
+            node, it = work[-1]
+            descended = False
+            for child in it:
+                if child not in index:
+                    index[child] = low[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(children(child))))
+                    descended = True
+                    break
+                if child in on_stack:
+                    low[node] = min(low[node], index[child])
+            if descended:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+
+            if low[node] == index[node]:
+                scc = []
+                while True:
+                    w = stack.pop()
+                    on_stack.discard(w)
+                    scc.append(w)
+                    if w == node: break
+                result.append(scc)
+
+    return result
+
+def find_cycle(start, members, children):
+    """強連結成分の中から start に戻ってくる循環を1つ取り出す（start → … → start）"""
+    prev = {}
+    queue = [start]
+    for node in queue:
+        for child in children(node):
+            if child not in members: continue
+            if child == start:
+                path = [node]
+                while path[-1] != start:
+                    path.append(prev[path[-1]])
+                return path[::-1] + [start]
+            if child not in prev:
+                prev[child] = node
+                queue.append(child)
+    return [start]
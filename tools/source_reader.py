@@ -0,0 +1,66 @@
+import csv
+import os
+
+# 熟語ソースの列（熟語,よみ,意味,例文）
+SOURCE_FIELDS = ["kanji", "reading", "meaning", "sentence"]
+
+def is_data_line(line):
+    """空行、コメント、見出し行、カンマがない行はデータではない"""
+    if not line: return False
+    if line.startswith("#"): return False
+    if line.startswith("-") or line.startswith("["): return False
+    return "," in line
+
+def split_fields(line):
+    """
+    1行をカンマで列に分ける
+    "..." で囲んだ列の中のカンマと、\\, でエスケープしたカンマは区切りとして扱わない
+    """
+    # ほとんどの行は引用符もエスケープもないので、そのまま分割する
+    if '"' not in line and "\\" not in line:
+        return line.split(",")
+    return next(csv.reader([line], escapechar="\\", skipinitialspace=True, strict=True))
+
+def iter_source_lines(filepath, problems=None):
+    """
+    熟語ソースを1行ずつ読み、データ行だけを (行番号, 行, 列のリスト) で返すジェネレーター
+    ファイル全体を読み込まないので、行数によらずメモリ使用量は一定
+    problems: リストを渡すと、不正な行を (ファイル名, 行番号, 理由) で追加する
+    ※ 先頭の BOM は utf-8-sig で読み捨てる（熟語の1文字目に混ざらないように）
+    """
+    name = os.path.basename(filepath)
+
+    def report(line_no, reason):
+        if problems is not None:
+            problems.append((name, line_no, reason))
+
+    with open(filepath, "r", encoding="utf-8-sig") as f:
+        for line_no, raw in enumerate(f, 1):
+            line = raw.strip()
+            if not is_data_line(line):
+                continue
+
+            try:
+                fields = split_fields(line)
+            except csv.Error as e:
+                report(line_no, f"列を読み取れません（{e}）")
+                continue
+
+            if len(fields) > len(SOURCE_FIELDS):
+                # 引用符なしの例文にカンマが入っている: 切り捨てずに例文へ戻す
+                report(line_no, f"列が多すぎます（{len(fields)} 列）。例文に , を含めるときは \"...\" で囲んでください")
+                last = len(SOURCE_FIELDS) - 1
+                fields = fields[:last] + [",".join(fields[last:])]
+
+            if not fields[0].strip():
+                report(line_no, "熟語が空です")
+                continue
+
+            yield line_no, line, fields
+
+def print_problems(problems):
+    if not problems:
+        return
+    print(f"⚠️ 不正な行が {len(problems)} 件あります:")
+    for name, line_no, reason in problems:
+        print(f"   {name}:{line_no}: {reason}")
@@ -0,0 +1,268 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from recipe_graph import find_cycle, strongly_connected_components
+from source_reader import iter_source_lines
+
+# ==========================================
+# 設定
+# ==========================================
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+IDS_FILE = os.path.join(CURRENT_DIR, "../src/features/kanji-core/data/ids-map-auto.json")
+CONFIG_FILE = os.path.join(CURRENT_DIR, "dictionary_config.json")
+
+# チェック対象のソースファイル
+# ここにある熟語に使われている漢字だけを検査します
+SOURCE_FILES = [
+    "jukugo_source.txt",
+    "jukugo_source_extra.txt"
+]
+
+def load_json(filepath):
+    if not os.path.exists(filepath):
+        return None
+    with open(filepath, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+class ValidationContext:
+    """全チェックで共有する入力データ（1回だけ読み込む）"""
+    def __init__(self, ids_map, atomic_parts, target_kanjis, missing_sources):
+        self.ids_map = ids_map
+        self.atomic_parts = atomic_parts
+        self.target_kanjis = target_kanjis
+        self.missing_sources = missing_sources
+
+    @classmethod
+    def load(cls):
+        ids_map = load_json(IDS_FILE)
+        config_data = load_json(CONFIG_FILE) or {}
+        atomic_parts = set(config_data.get("atomic_parts", []))
+
+        targets = set()
+        missing_sources = []
+        for filename in SOURCE_FILES:
+            filepath = os.path.join(CURRENT_DIR, filename)
+            if not os.path.exists(filepath):
+                missing_sources.append(filename)
+                continue
+            # コメント行や空行、データ形式でない行は iter_source_lines() が読み飛ばす
+            for _, _, fields in iter_source_lines(filepath):
+                jukugo = fields[0].strip()
+                for char in jukugo:
+                    if char not in "ー": # 長音などは除外
+                        targets.add(char)
+
+        return cls(ids_map, atomic_parts, targets, missing_sources)
+
+def compute_reachability(ids_map, atomic_parts):
+    """
+    レシピグラフ全体の作成可能性を、依存先から順に1回のスイープで確定させる
+    戻り値: 文字 -> (作れるか, 理由)
+    """
+    def children(char):
+        return [p for p in ids_map[char] if p not in atomic_parts and p in ids_map]
+
+    nodes = [k for k in ids_map if k not in atomic_parts]
+    result = {}
+
+    for scc in strongly_connected_components(nodes, children):
+        members = set(scc)
+        cycle_reason = None
+        if len(scc) > 1:
+            cycle = find_cycle(min(scc), members, children)
+            cycle_reason = f"循環参照 ({' → '.join(cycle)})"
+
+        for char in scc:
+            reason = None
+            for p in ids_map[char]:
+                if p in atomic_parts:
+                    continue
+                if p not in ids_map:
+                    sub_reason = "レシピなし"
+                elif p in members:
+                    sub_reason = cycle_reason
+                else:
+                    ok, sub_reason = result[p]
+                    if ok: continue
+                reason = f"「{p}」が作れない ({sub_reason})"
+                break
+            result[char] = (reason is None, reason)
+
+    return result
+
+def can_make(char, reachability, atomic_parts, ids_map):
+    # 1. 原子パーツならOK
+    if char in atomic_parts:
+        return True, None
+    # 2. 辞書にない
+    if char not in ids_map:
+        return False, "レシピなし"
+    return reachability[char]
+
+# ==========================================
+# 各チェック
+# ==========================================
+def check_multi_part(ctx):
+    """3つ以上の同時合体が必要な漢字（中間パーツ化されていないレシピ）"""
+    risky = []
+    for kanji, parts in ctx.ids_map.items():
+        # 中間パーツ（&から始まるもの）はシステム側で処理するので無視してOK
+        if kanji.startswith("&"):
+            continue
+        # パーツが3つ以上ある場合、ゲームシステムによっては合体できない可能性が高い
+        if len(parts) >= 3:
+            risky.append({"kanji": kanji, "parts": parts})
+    return risky
+
+def check_definitions(ctx):
+    """ゲームに登場するのにレシピ定義がない漢字"""
+    missing = []
+    for char in sorted(ctx.target_kanjis):
+        # 原子パーツならOK（これ以上分解しないのでレシピ不要）
+        if char in ctx.atomic_parts:
+            continue
+        # 辞書の「キー（見出し語）」として存在するか？
+        if char not in ctx.ids_map:
+            missing.append({"kanji": char})
+    return missing
+
+def check_reachability(ctx):
+    """ゲームに登場する漢字が原子パーツまで辿れるか"""
+    reachability = compute_reachability(ctx.ids_map, ctx.atomic_parts)
+    errors = []
+    for char in sorted(ctx.target_kanjis):
+        ok, reason = can_make(char, reachability, ctx.atomic_parts, ctx.ids_map)
+        if not ok:
+            errors.append({"kanji": char, "reason": reason})
+    return errors
+
+# ==========================================
+# 表示（各スクリプトの従来の出力）
+# ==========================================
+def print_multi_part(ctx, risky):
+    print("🔍 辞書データの整合性チェックを開始します...")
+    print("-" * 40)
+    if risky:
+        print(f"⚠️  修正推奨の漢字が {len(risky)} 個見つかりました！")
+        print("これらは「3つ以上の同時合体」が必要になっており、")
+        print("ゲーム内で作れない可能性があります。")
+        print("-" * 40)
+        for item in risky:
+            print(f"・{item['kanji']}: {item['parts']}")
+        print("-" * 40)
+        print("【修正方法】")
+        print("tools/dictionary_config.json の manual_overrides に")
+        print("2個ずつ合体させるレシピを追加してください。")
+        print("（python optimize_recipes.py で、この形式のまま貼り付けられるレシピの案を出せます）")
+    else:
+        print("✅ 問題のある漢字は見つかりませんでした！")
+        print("すべての漢字が2パーツ以下の合体で構成されています。")
+
+def print_definitions(ctx, missing):
+    print("🔍 漢字定義抜け漏れチェック...")
+    print(f"🎯 ゲーム登場漢字: {len(ctx.target_kanjis)} 文字")
+    print("-" * 60)
+    if missing:
+        print(f"😱 以下の {len(missing)} 文字は、レシピ定義がありません！")
+        print("これらは合体で作れなかったり、謎のID（&XX_0）が表示される原因になります。")
+        print("-" * 60)
+        for item in missing:
+            print(f"❌ {item['kanji']}")
+
+        print("-" * 60)
+        print("【対策】 tools/dictionary_config.json の manual_overrides に追加してください。")
+    else:
+        print("✅ 完璧です！使用される全ての漢字に定義が存在します。")
+
+def print_reachability(ctx, errors):
+    print("🔍 ゲーム内熟語の作成可能性チェック...")
+    print(f"📄 原子パーツ数: {len(ctx.atomic_parts)}")
+    print(f"🎯 ゲーム登場漢字: {len(ctx.target_kanjis)} 文字")
+    print("-" * 60)
+    for item in errors:
+        print(f"❌ {item['kanji']} : {item['reason']}")
+
+    print("-" * 60)
+    if errors:
+        print(f"😱 合計 {len(errors)} 文字が作成不可能です！")
+        print("これらを tools/dictionary_config.json の manual_overrides に追加してください。")
+    else:
+        print("🎉 おめでとうございます！登場する全ての熟語が作成可能です！")
+
+# チェック名 -> (チェック関数, 表示関数)
+CHECKS = {
+    "multi_part": (check_multi_part, print_multi_part),
+    "definitions": (check_definitions, print_definitions),
+    "reachability": (check_reachability, print_reachability),
+}
+
+def run_checks(names=None, report_path=None):
+    """
+    入力を1回だけ読み込み、指定したチェックをまとめて実行する
+    戻り値: すべてのチェックが問題なしなら True
+    """
+    names = names or list(CHECKS)
+    total_start = time.perf_counter()
+
+    start = time.perf_counter()
+    ctx = ValidationContext.load()
+    load_ms = (time.perf_counter() - start) * 1000
+
+    for filename in ctx.missing_sources:
+        print(f"⚠️ ソースファイルが見つかりません: {filename}")
+    if ctx.ids_map is None:
+        print(f"❌ ファイルが見つかりません: {IDS_FILE}")
+        return False
+
+    report = {"load_ms": round(load_ms, 3), "checks": {}}
+    all_ok = True
+    for i, name in enumerate(names):
+        check, show = CHECKS[name]
+        start = time.perf_counter()
+        items = check(ctx)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if i > 0: print()
+        show(ctx, items)
+
+        all_ok = all_ok and not items
+        report["checks"][name] = {
+            "ok": not items,
+            "count": len(items),
+            "elapsed_ms": round(elapsed_ms, 3),
+            "items": items,
+        }
+
+    report["total_ms"] = round((time.perf_counter() - total_start) * 1000, 3)
+
+    if report_path:
+        os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"📝 レポートを書き出しました: {report_path}")
+
+    return all_ok
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="辞書・熟語データの検証をまとめて実行する")
+    parser.add_argument(
+        "--check", action="append", choices=list(CHECKS),
+        help="実行するチェック（複数指定可。省略時はすべて）"
+    )
+    parser.add_argument(
+        "--json", metavar="PATH",
+        help="チェックごとの結果と所要時間を JSON で書き出す"
+    )
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    ok = run_checks(args.check, args.json)
+    # build.py や CI が失敗を検知できるよう、指摘があれば終了コード 1 にする
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from generate_dictionary import merge_key
+from generate_problems import OUTPUT_ATOMS_FILE, attach_atoms
+
+# ==========================================
+# 設定
+# ==========================================
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(CURRENT_DIR, "../src/features/kanji-core/data")
+JUKUGO_DB_FILE = os.path.join(DATA_DIR, "jukugo-db-auto.json")
+MERGE_INDEX_FILE = os.path.join(DATA_DIR, "merge-index-auto.json")
+DISTRACTOR_POOL_FILE = os.path.join(DATA_DIR, "distractor-pool-auto.json")
+# ダミーパーツの表はクライアント側が正（同じ表を読んで検査する）
+GENERATOR_TS = os.path.join(CURRENT_DIR, "../src/features/kanji-core/logic/generator.ts")
+
+# 別解はこの数まで集めれば十分（全列挙はしない）
+MAX_SOLUTIONS = 4
+
+def load_json(filepath):
+    if not os.path.exists(filepath):
+        return None
+    with open(filepath, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def load_jukugo_db(filepath=JUKUGO_DB_FILE):
+    """問題DBを読み、文字ごとの原子パーツ（atom-parts-auto.json）を熟語ごとの atoms として付ける"""
+    jukugo_db = load_json(filepath)
+    if jukugo_db is not None:
+        attach_atoms(jukugo_db, load_json(OUTPUT_ATOMS_FILE) or {})
+    return jukugo_db
+
+def load_generator_tables(filepath=GENERATOR_TS):
+    """
+    generator.ts から BLACKLIST_KANJI / CONFUSING_PAIRS / DEFAULT_DISTRACTORS を読み取る
+    戻り値: (ブラックリスト, 紛らわしい文字の表, 汎用ダミー)
+    """
+    with open(filepath, "r", encoding="utf-8") as f:
+        src = f.read()
+
+    def block(name, open_char, close_char):
+        m = re.search(rf"{name}[^=]*=\s*\{open_char}(.*?)\{close_char};", src, re.S)
+        if m is None:
+            raise ValueError(f"generator.ts に {name} が見つかりません")
+        return m.group(1)
+
+    blacklist = re.findall(r'"([^"]+)"', block("BLACKLIST_KANJI", "[", "]"))
+    confusing = {
+        key: re.findall(r'"([^"]+)"', values)
+        for key, values in re.findall(r'"([^"]+)"\s*:\s*\[([^\]]*)\]', block("CONFUSING_PAIRS", "{", "}"))
+    }
+    defaults = re.findall(r'"([^"]+)"', block("DEFAULT_DISTRACTORS", "[", "]"))
+    return blacklist, confusing, defaults
+
+def is_blacklisted(jukugo, blacklist):
+    """generator.ts の出題候補フィルタと同じ条件"""
+    return jukugo["kanji"] in blacklist or any(bk in c for c in jukugo["components"] for bk in blacklist)
+
+def distractor_pool(jukugo, correct_parts, confusing, defaults, pools):
+    """
+    クライアントが選びうるダミーの全候補（この中から何個か選ばれる）
+    事前計算済みのプール（generate_distractors.py）があればその全段階、なければ getDistractorParts() の候補
+    """
+    tiers = pools.get(jukugo["kanji"])
+    if tiers is not None:
+        return sorted({c for tier in tiers for c in tier.split()})
+    candidates = []
+    for char in correct_parts:
+        candidates.extend(confusing.get(char, []))
+    candidates.extend(defaults)
+    correct = set(correct_parts)
+    return sorted({c for c in candidates if c not in correct})
+
+def stage_parts(jukugo, mode):
+    """generateStageParts() と同じ正解パーツ（EASY は最後の1文字を分解しない）"""
+    components = jukugo["components"]
+    atoms = jukugo.get("atoms") or components
+    parts = []
+    for i, k in enumerate(components):
+        if mode == "EASY" and i == len(components) - 1:
+            parts.append(k)
+        else:
+            parts.extend(atoms[i].split(" "))
+    return parts
+
+def is_easy_candidate(jukugo):
+    """generateRandomStage() の EASY モードで出題されうるか"""
+    return len(jukugo["components"]) <= 2 and jukugo["difficulty"] <= 3
+
+def _remove(items, i, j=None):
+    return items[:i] + items[i + 1:j] + (items[j + 1:] if j is not None else ())
+
+def _insert(items, char):
+    return tuple(sorted(items + (char,)))
+
+# ==========================================
+# 探索
+# ==========================================
+class StageSolver:
+    """
+    盤面（パーツの多重集合）と残りのゴール（熟語の各文字）を状態にした全探索
+    - 2つのパーツを合体（merge-index に載っているペアだけ）
+      結果がゴールの文字なら自動でマスに入る（useGridInteraction.ts と同じ）
+    - ゴールと同じ文字のパーツをタップしてマスに入れる
+    状態はソート済みタプルで正規化してメモ化し、パーツ数がゴール数より少ない状態は枝刈りする
+    （分解操作は正解パーツから作れるものを増やさないので扱わない）
+    """
+    def __init__(self, merge_index, max_solutions=MAX_SOLUTIONS):
+        self.merge_index = merge_index
+        self.max_solutions = max_solutions
+        self.memo = {}
+        self.seen_chars = set()
+
+    def solve(self, parts, targets):
+        """戻り値: 解（合体手順 "A+B=R" の多重集合）の集合。空なら解なし"""
+        return self._search(tuple(sorted(parts)), tuple(sorted(targets)))
+
+    def _search(self, board, targets):
+        if not targets:
+            return frozenset({()})
+        key = (board, targets)
+        if key in self.memo:
+            return self.memo[key]
+
+        self.seen_chars.update(board)
+        solutions = set()
+
+        def collect(child, step=None):
+            for sol in child:
+                if len(solutions) >= self.max_solutions:
+                    return
+                solutions.add(tuple(sorted(sol + (step,))) if step else sol)
+
+        if len(board) >= len(targets):
+            for i, char in enumerate(board):
+                if i > 0 and board[i - 1] == char:
+                    continue
+                # タップでマスに入れる
+                if char in targets:
+                    t = targets.index(char)
+                    collect(self._search(_remove(board, i), _remove(targets, t)))
+
+                for j in range(i + 1, len(board)):
+                    if j > i + 1 and board[j - 1] == board[j]:
+                        continue
+                    pair = merge_key(char, board[j])
+                    result = self.merge_index.get(pair)
+                    if result is None:
+                        continue
+                    rest = _remove(board, i, j)
+                    if result in targets:
+                        child = self._search(rest, _remove(targets, targets.index(result)))
+                    else:
+                        child = self._search(_insert(rest, result), targets)
+                    collect(child, f"{pair}={result}")
+
+        solutions = frozenset(solutions)
+        self.memo[key] = solutions
+        return solutions
+
+def accidental_merges(pool, reachable, targets, merge_index):
+    """
+    ダミーが関わる合体を調べる
+    戻り値: (正解側の文字と合体できてしまうペア・ゴールに直接入るダミー, ダミー同士で合体できるペア)
+    reachable: 探索中に盤面に現れた文字（正解パーツと途中でできる文字）
+    """
+    steals = [f"{d}（ゴールの文字そのもの）" for d in pool if d in targets]
+    among = []
+    for i, d in enumerate(pool):
+        for other in sorted(reachable):
+            pair = merge_key(d, other)
+            if pair in merge_index:
+                steals.append(f"{pair}={merge_index[pair]}")
+        # ダミーは同じ文字を2つ出さないので、別の文字どうしだけ
+        for other in pool[i + 1:]:
+            pair = merge_key(d, other)
+            if pair in merge_index:
+                among.append(f"{pair}={merge_index[pair]}")
+    return steals, among
+
+def check_stage(jukugo, mode, merge_index, confusing, defaults, pools):
+    parts = stage_parts(jukugo, mode)
+    targets = jukugo["components"]
+    solver = StageSolver(merge_index)
+    solutions = solver.solve(parts, targets)
+
+    result = {
+        "id": jukugo["id"], "kanji": jukugo["kanji"], "mode": mode,
+        "parts": parts, "states": len(solver.memo),
+        "solvable": bool(solutions), "solutions": sorted(list(s) for s in solutions),
+    }
+
+    # EASY はダミーなし
+    if mode == "NORMAL":
+        pool = distractor_pool(jukugo, parts, confusing, defaults, pools)
+        result["accidental"], result["among_distractors"] = accidental_merges(
+            pool, solver.seen_chars | set(parts), set(targets), merge_index
+        )
+        # 正解パーツだけでは解けないのにダミー込みだと解ける（＝ダミー頼み）
+        if not solutions and pool:
+            result["needs_distractors"] = bool(StageSolver(merge_index, 1).solve(parts + pool, targets))
+    return result
+
+# ==========================================
+# 並列実行
+# ==========================================
+_worker_tables = None
+
+def _init_worker(merge_index, confusing, defaults, pools):
+    global _worker_tables
+    _worker_tables = (merge_index, confusing, defaults, pools)
+
+def _check_chunk(chunk):
+    merge_index, confusing, defaults, pools = _worker_tables
+    return [check_stage(jukugo, mode, merge_index, confusing, defaults, pools) for jukugo, mode in chunk]
+
+def check_all_stages(stages, merge_index, confusing, defaults, pools, jobs=1):
+    """(熟語, モード) のリストを検査する（jobs > 1 ならプロセスプールで分担、結果の順番は入力順）"""
+    if jobs <= 1 or len(stages) < 2:
+        _init_worker(merge_index, confusing, defaults, pools)
+        return _check_chunk(stages)
+
+    chunk_size = max(1, -(-len(stages) // (jobs * 4)))
+    chunks = [stages[i:i + chunk_size] for i in range(0, len(stages), chunk_size)]
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(merge_index, confusing, defaults, pools)
+    ) as executor:
+        for chunk_results in executor.map(_check_chunk, chunks):
+            results.extend(chunk_results)
+    return results
+
+# ==========================================
+# 表示
+# ==========================================
+def summarize(results):
+    unsolvable = [r for r in results if not r["solvable"]]
+    alternatives = [r for r in results if len(r["solutions"]) > 1]
+    accidental = [r for r in results if r.get("accidental")]
+    return unsolvable, alternatives, accidental
+
+def stale_pool_keys(pools, jukugo_db):
+    """問題DBにない熟語のプール（DBを作り直した後にダミー候補を再生成していない）"""
+    known = {jukugo["kanji"] for jukugo in jukugo_db}
+    return sorted(k for k in pools if k not in known)
+
+def print_report(results, elapsed_ms):
+    unsolvable, alternatives, accidental = summarize(results)
+    print(f"🧩 ステージ数: {len(results)} / 探索した状態: {sum(r['states'] for r in results):,}（{elapsed_ms:.0f}ms）")
+    print("-" * 60)
+
+    for r in unsolvable:
+        note = "（ダミー込みなら解ける）" if r.get("needs_distractors") else ""
+        print(f"❌ [{r['mode']}] {r['kanji']} : 解けません {r['parts']}{note}")
+    for r in alternatives:
+        shown = " / ".join(", ".join(s) for s in r["solutions"][:2])
+        print(f"🔀 [{r['mode']}] {r['kanji']} : 別解 {len(r['solutions'])} 通り以上 ({shown})")
+    for r in accidental:
+        print(f"⚠️ [{r['mode']}] {r['kanji']} : 正解パーツとダミーが合体できてしまう {', '.join(r['accidental'])}")
+
+    # ダミー同士の合体は汎用ダミーが原因のことが多いので、ペアごとにまとめて表示する
+    among = {}
+    for r in results:
+        for pair in r.get("among_distractors", []):
+            among[pair] = among.get(pair, 0) + 1
+    if among:
+        print(f"🎲 ダミー同士で合体できるペア: {len(among)} 種類")
+        for pair, count in sorted(among.items(), key=lambda x: (-x[1], x[0])):
+            print(f"   {pair}（{count} ステージ）")
+
+    print("-" * 60)
+    if unsolvable:
+        print(f"😱 合計 {len(unsolvable)} ステージが解けません！")
+    else:
+        print("🎉 すべてのステージが解けます！")
+    print(f"   別解あり: {len(alternatives)} / 正解パーツとダミーの誤合体あり: {len(accidental)}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="問題DBの各ステージが実際に解けるかを全探索で検査する")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="並列実行するプロセス数")
+    parser.add_argument(
+        "--json", metavar="PATH",
+        help="結果を JSON で書き出す（validate_all.py のレポートと同じ形式）"
+    )
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    jukugo_db = load_jukugo_db()
+    merge_index = load_json(MERGE_INDEX_FILE)
+    if jukugo_db is None or merge_index is None:
+        print("❌ jukugo-db-auto.json / merge-index-auto.json が見つかりません。先に生成してください。")
+        sys.exit(1)
+    blacklist, confusing, defaults = load_generator_tables()
+    pools = load_json(DISTRACTOR_POOL_FILE) or {}
+
+    stages = []
+    for jukugo in jukugo_db:
+        if is_blacklisted(jukugo, blacklist):
+            continue
+        stages.append((jukugo, "NORMAL"))
+        if is_easy_candidate(jukugo):
+            stages.append((jukugo, "EASY"))
+
+    print("🔍 ステージの可解性チェック...")
+    start = time.perf_counter()
+    results = check_all_stages(stages, merge_index, confusing, defaults, pools, args.jobs)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print_report(results, elapsed_ms)
+
+    stale = stale_pool_keys(pools, jukugo_db)
+    if stale:
+        print(f"❌ 問題DBにない熟語のダミー候補: {len(stale)} 件（generate_distractors.py を再実行してください）")
+
+    unsolvable, alternatives, accidental = summarize(results)
+    if args.json:
+        report = {
+            "checks": {
+                "stages": {
+                    "ok": not unsolvable,
+                    "count": len(unsolvable),
+                    "elapsed_ms": round(elapsed_ms, 3),
+                    "items": unsolvable,
+                },
+                "distractor_pool": {
+                    "ok": not stale,
+                    "count": len(stale),
+                    "items": stale,
+                },
+            },
+            # 解けないわけではないので指摘件数には数えない
+            "alternatives": alternatives,
+            "accidental": accidental,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"📝 レポートを書き出しました: {args.json}")
+
+    # 解けないステージ・古いダミー候補があれば失敗扱い（build.py / CI で止める）
+    if unsolvable or stale:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()